@@ -1,30 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
-from app.database.base import get_db
+from app.core.broadcast import broadcaster, publish_with_stats, stats_cache
+from app.core.export import export_response
+from app.core.pagination import keyset_paginate
+from app.core.query_budget import query_budget
+from app.database.base import AsyncSessionLocal, get_db
 from app.database.models import Alert, Dashboard
-from app.database.schemas import Alert as AlertSchema, AlertCreate
+from app.database.schemas import Alert as AlertSchema, AlertCreate, AlertPage, DashboardStats
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AlertSchema])
-def get_alerts(db: Session = Depends(get_db)):
-    alerts = db.query(Alert).filter(Alert.is_active == True).all()
-    return alerts
+STREAM_RETRY_MS = 3000
+STREAM_KEEPALIVE_SECONDS = 15
+
+_stats_lock = asyncio.Lock()
+
+async def _stats_snapshot() -> Optional[dict]:
+    """Current dashboard counters, read once per STATS_TTL_SECONDS however many streams connect"""
+    stats = stats_cache.get("stats")
+    if stats is None:
+        async with _stats_lock:
+            stats = stats_cache.get("stats")
+            if stats is None:
+                async with AsyncSessionLocal() as db:
+                    row = (await db.execute(select(Dashboard).limit(1))).scalars().first()
+                stats = DashboardStats.model_validate(row).model_dump(mode="json") if row else {}
+                stats_cache.set("stats", stats)
+    return stats or None
+
+def filter_alerts(query, alert_type: Optional[str] = None, severity: Optional[str] = None):
+    query = query.filter(Alert.is_active == True)
+    if alert_type is not None:
+        query = query.filter(Alert.alert_type == alert_type)
+    if severity is not None:
+        query = query.filter(Alert.severity == severity)
+    return query
+
+@router.get("/", response_model=AlertPage)
+def get_alerts(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    alert_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    query = filter_alerts(db.query(Alert), alert_type, severity)
+    alerts, next_cursor = keyset_paginate(query, Alert, cursor, limit)
+    return {"items": alerts, "next_cursor": next_cursor}
+
+EXPORT_COLUMNS = [
+    Alert.id, Alert.title, Alert.message, Alert.alert_type, Alert.severity, Alert.location,
+    Alert.is_active, Alert.created_at, Alert.resolved_at,
+]
+
+@router.get("/export")
+@query_budget(None, batched=True)
+def export_alerts(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    alert_type: Optional[str] = None,
+    severity: Optional[str] = None
+):
+    """Every active alert matching the listing filters, streamed as CSV or NDJSON (optionally gzip-compressed)"""
+    return export_response(
+        Alert, EXPORT_COLUMNS,
+        lambda query: filter_alerts(query, alert_type, severity),
+        "alerts", format, gzip,
+    )
+
+@router.get("/stream")
+@query_budget(1)
+async def stream_alerts(
+    duration: int = Query(300, ge=0, le=3600),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events: `alert.created`, `alert.resolved`, `report.validated`
+    and `stats` (the dashboard counters) as writes happen. Opens with the
+    current counters, or with the events missed since `Last-Event-ID`; sends
+    `reset` when those are no longer available. The stream ends after
+    `duration` seconds and EventSource reconnects where it left off.
+    """
+    async def events():
+        queue = broadcaster.subscribe()
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+            missed = broadcaster.history_since(int(last_event_id)) if last_event_id and last_event_id.isdigit() else None
+            if missed is None:
+                if last_event_id:
+                    yield b"event: reset\ndata: {}\n\n"
+                stats = await _stats_snapshot()
+                if stats:
+                    yield f"event: stats\ndata: {json.dumps(stats)}\n\n".encode()
+            else:
+                for event in missed:
+                    yield event.encode()
+
+            # Events published between subscribing and reading the history
+            # are in both; skip the queued copies of anything already replayed
+            last_sent = missed[-1].id if missed else 0
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + duration
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), min(remaining, STREAM_KEEPALIVE_SECONDS))
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event.id <= last_sent:
+                    continue
+                yield event.encode()
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @router.post("/", response_model=AlertSchema)
 def create_alert(alert: AlertCreate, db: Session = Depends(get_db)):
     db_alert = Alert(**alert.dict())
     db.add(db_alert)
-    
-    # Update dashboard stats
-    stats = db.query(Dashboard).first()
-    if stats:
-        stats.active_alerts += 1
-    
     db.commit()
     db.refresh(db_alert)
+    publish_with_stats(db, "alert.created", AlertSchema.model_validate(db_alert).model_dump(mode="json"))
     return db_alert
 
 @router.put("/{alert_id}/resolve")
@@ -34,11 +141,6 @@ def resolve_alert(alert_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Alert not found")
     
     alert.is_active = False
-    
-    # Update dashboard stats
-    stats = db.query(Dashboard).first()
-    if stats:
-        stats.active_alerts = max(0, stats.active_alerts - 1)
-    
     db.commit()
+    publish_with_stats(db, "alert.resolved", {"id": alert_id})
     return {"message": "Alert resolved successfully"}
\ No newline at end of file
@@ -1,27 +1,38 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.database.base import get_db
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token
+from app.database.base import get_async_db
 from app.database.models import User
 from app.database.schemas import UserCreate, User as UserSchema, Token, UserLogin
 from app.auth.dependencies import get_current_active_user
 
 router = APIRouter()
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return False
+    
+    # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the password
+    if password_hasher.needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await password_hasher.hash(password)
+            await db.commit()
+        except HTTPException:
+            # Hasher saturated; keep the old hash and retry on a later login
+            pass
     return user
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -31,23 +42,23 @@ def create_user(db: Session, user: UserCreate):
         is_sentinel=True  # All registered users become sentinels
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/register", response_model=UserSchema)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
-    return create_user(db=db, user=user)
+    return await create_user(db=db, user=user)
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(user_login: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_login.email, user_login.password)
+async def login_for_access_token(user_login: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, user_login.email, user_login.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,11 +72,11 @@ def login_for_access_token(user_login: UserLogin, db: Session = Depends(get_db))
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/token", response_model=Token)
-def login_for_access_token_form(
+async def login_for_access_token_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
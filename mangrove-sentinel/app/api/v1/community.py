@@ -1,35 +1,39 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import case, func, desc
 from typing import List, Dict
 from datetime import datetime, timedelta
 import random
 
+from app.core.conditional import conditional_get
+from app.core.query_budget import query_budget
+from app.core.response_cache import cached_response
+from app.database.aggregates import count_where, counts, tally
 from app.database.base import get_db
 from app.database.models import User, Report
 
 router = APIRouter()
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[conditional_get("reports", "users")])
+@query_budget(2)
+@cached_response("reports", "users")
 def get_community_stats(db: Session = Depends(get_db)):
     """Get community statistics from database"""
     
-    # Active volunteers (sentinels)
-    active_volunteers = db.query(User).filter(
-        User.is_active == True,
-        User.is_sentinel == True
-    ).count()
-    
-    # Local groups - estimate based on unique locations of users
-    local_groups = db.query(func.count(func.distinct(User.location))).filter(
-        User.location.isnot(None),
-        User.is_active == True
-    ).scalar() or 5
-    
-    # Completed projects - count validated reports as completed projects
-    completed_projects = db.query(Report).filter(
-        Report.validated == True
-    ).count()
+    row = counts(
+        db,
+        tally(
+            User,
+            # Active volunteers (sentinels)
+            active_volunteers=count_where(User.is_active == True, User.is_sentinel == True),
+            # Local groups - estimate based on unique locations of active users
+            local_groups=func.count(func.distinct(case((User.is_active == True, User.location)))),
+        ),
+        # Completed projects - count validated reports as completed projects
+        tally(Report, completed_projects=count_where(Report.validated == True)),
+    )
+    active_volunteers, completed_projects = row.active_volunteers, row.completed_projects
+    local_groups = row.local_groups or 5
     
     # Impact hours - estimate based on volunteer activity
     impact_hours = (active_volunteers * 15) + (completed_projects * 3)
@@ -42,6 +46,7 @@ def get_community_stats(db: Session = Depends(get_db)):
     }
 
 @router.get("/volunteer-opportunities")
+@cached_response("reports")
 def get_volunteer_opportunities(db: Session = Depends(get_db)):
     """Generate volunteer opportunities based on recent reports and zones"""
     
@@ -97,6 +102,7 @@ def get_volunteer_opportunities(db: Session = Depends(get_db)):
     return opportunities
 
 @router.get("/local-groups")
+@cached_response("users")
 def get_local_groups(db: Session = Depends(get_db)):
     """Get local groups based on user locations and activity"""
     
@@ -144,6 +150,7 @@ def get_local_groups(db: Session = Depends(get_db)):
     return groups
 
 @router.get("/success-stories")
+@cached_response("reports")
 def get_success_stories(db: Session = Depends(get_db)):
     """Get success stories based on validated reports"""
     
@@ -196,6 +203,7 @@ def get_success_stories(db: Session = Depends(get_db)):
     return stories
 
 @router.get("/volunteer-of-month")
+@cached_response("users")
 def get_volunteer_of_month(db: Session = Depends(get_db)):
     """Get volunteer of the month based on highest points"""
     
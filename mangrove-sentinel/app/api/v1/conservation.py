@@ -1,26 +1,33 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case
 from typing import List, Dict
 from datetime import datetime, timedelta
 import random
 
+from app.core.conditional import conditional_get
+from app.core.query_budget import query_budget
+from app.core.response_cache import cached_response
+from app.core.single_flight import single_flight
+from app.database.aggregates import count_where, counts, tally
 from app.database.base import get_db
 from app.database.models import Report, User, Zone
 
 router = APIRouter()
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[conditional_get("reports", "users")])
+@query_budget(2)
+@cached_response("reports", "users")
 def get_conservation_stats(db: Session = Depends(get_db)):
     """Get conservation statistics from database"""
-    # Get actual validated reports count
-    validated_reports = db.query(Report).filter(Report.validated == True).count()
-    
-    # Get active sentinels count  
-    active_volunteers = db.query(User).filter(
-        User.is_active == True,
-        User.is_sentinel == True
-    ).count()
+    row = counts(
+        db,
+        # Actual validated reports count
+        tally(Report, validated_reports=count_where(Report.validated == True)),
+        # Active sentinels count
+        tally(User, active_volunteers=count_where(User.is_active == True, User.is_sentinel == True)),
+    )
+    validated_reports, active_volunteers = row.validated_reports, row.active_volunteers
     
     # Calculate trees planted based on validated reports (estimate 15 trees per report)
     trees_planted = validated_reports * 15
@@ -36,13 +43,15 @@ def get_conservation_stats(db: Session = Depends(get_db)):
     }
 
 @router.get("/projects")
+@single_flight
+@cached_response("reports")
 def get_conservation_projects(db: Session = Depends(get_db)):
     """Get conservation projects with real data"""
     # Get reports grouped by location to create project data
     location_reports = db.query(
         Report.location,
         func.count(Report.id).label('report_count'),
-        func.sum(func.case((Report.validated == True, 1), else_=0)).label('validated_count')
+        func.sum(case((Report.validated == True, 1), else_=0)).label('validated_count')
     ).group_by(Report.location).all()
     
     projects = []
@@ -65,6 +74,7 @@ def get_conservation_projects(db: Session = Depends(get_db)):
     return projects
 
 @router.get("/updates")
+@cached_response("reports")
 def get_recent_updates(db: Session = Depends(get_db)):
     """Get recent conservation updates from validated reports"""
     recent_reports = db.query(Report).filter(
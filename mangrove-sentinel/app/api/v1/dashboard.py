@@ -1,42 +1,37 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from datetime import datetime
 
-from app.database.base import get_db
-from app.database.models import Dashboard, User, Report
+from app.core.conditional import async_conditional_get
+from app.database.base import get_async_db
+from app.database.models import Dashboard, Report
 from app.database.schemas import DashboardStats, ImpactData
 
 router = APIRouter()
 
-@router.get("/stats", response_model=DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db)):
-    stats = db.query(Dashboard).first()
+@router.get("/stats", response_model=DashboardStats, dependencies=[async_conditional_get("dashboard_stats")])
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
+    # Counters are maintained by triggers on the source tables (app/database/counters.py),
+    # so this path only reads
+    stats = (await db.execute(select(Dashboard).limit(1))).scalars().first()
     if not stats:
-        # Create default stats if none exist
-        stats = Dashboard(
+        return DashboardStats(
             active_alerts=0,
             high_risk_zones=0,
             validated_reports=0,
-            community_sentinels=0
+            community_sentinels=0,
+            updated_at=datetime.utcnow()
         )
-        db.add(stats)
-        db.commit()
-        db.refresh(stats)
-    
-    # Update real-time sentinel count
-    sentinel_count = db.query(User).filter(
-        User.is_active == True, 
-        User.is_sentinel == True
-    ).count()
-    stats.community_sentinels = sentinel_count
-    db.commit()
-    
     return stats
 
 @router.get("/impact", response_model=List[ImpactData])
-def get_impact_data(db: Session = Depends(get_db)):
+async def get_impact_data(db: AsyncSession = Depends(get_async_db)):
     # Get actual validated reports count for current month
-    current_validated = db.query(Report).filter(Report.validated == True).count()
+    current_validated = await db.scalar(
+        select(func.count()).select_from(Report).where(Report.validated == True)
+    )
     
     # Generate realistic progressive data showing improvement over time
     base_data = [
@@ -1,50 +1,44 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import List, Dict
 from datetime import datetime, timedelta
+import json
 import random
 
+from app.core.conditional import conditional_get
+from app.core.query_budget import query_budget
+from app.core.response_cache import cached_response
+from app.core.single_flight import single_flight
+from app.database.aggregates import count_of, count_where, counts, tally
 from app.database.base import get_db
 from app.database.models import Report, Alert, Zone
+from app.database.rollups import decode_monthly_report_counts, month_keys, monthly_report_counts, monthly_report_counts_json
 
 router = APIRouter()
 
-@router.get("/health-metrics")
-def get_ecosystem_health_metrics(db: Session = Depends(get_db)):
-    """Get ecosystem health metrics calculated from database data"""
-    
-    # Calculate water quality based on pollution reports (inverse relationship)
-    pollution_reports = db.query(Report).filter(
-        Report.threat_type == 'pollution',
-        Report.created_at >= datetime.utcnow() - timedelta(days=90)
-    ).count()
-    
+RESTORATION_THREATS = ['restoration', 'conservation']
+DESTRUCTION_THREATS = ['illegal_cutting', 'construction']
+SPECIES_THREATS = ['illegal_cutting', 'pollution', 'overfishing']
+
+# Each page payload is built from plain counts, so the individual routes and
+# /summary (which reads every count in one statement) return the same thing
+
+def health_metrics(pollution_reports: int, validated_reports: int, conservation_reports: int, destruction_reports: int) -> Dict:
     # Water quality index (0-100, lower pollution = higher quality)
     water_quality = max(50, 95 - (pollution_reports * 3))
-    
+
     # Species count - base number plus bonus for conservation efforts
-    validated_reports = db.query(Report).filter(Report.validated == True).count()
     species_count = 180 + min(validated_reports * 2, 120)  # Cap at 300 total
-    
-    # Forest cover percentage based on conservation vs destruction reports
-    conservation_reports = db.query(Report).filter(
-        Report.validated == True,
-        Report.threat_type.in_(['restoration', 'conservation'])
-    ).count()
-    
-    destruction_reports = db.query(Report).filter(
-        Report.threat_type.in_(['illegal_cutting', 'construction'])
-    ).count()
-    
+
     # Forest cover calculation
     base_forest_cover = 75
     forest_impact = (conservation_reports * 2) - (destruction_reports * 1.5)
     forest_cover = max(45, min(95, base_forest_cover + forest_impact))
-    
+
     # Health score based on all factors
     health_score = (water_quality * 0.3 + forest_cover * 0.4 + min(species_count/300 * 100, 100) * 0.3) / 10
-    
+
     return {
         "water_quality": int(water_quality),
         "species_count": species_count,
@@ -52,145 +46,202 @@ def get_ecosystem_health_metrics(db: Session = Depends(get_db)):
         "health_score": round(health_score, 1)
     }
 
-@router.get("/environmental-trends") 
-def get_environmental_trends(db: Session = Depends(get_db)):
-    """Get environmental trend data based on report history"""
-    
-    # Get monthly report data for trends
-    current_water_quality = 82
-    current_air_quality = 75
-    
-    # Generate trend data based on validated reports over time
+def environmental_trends(monthly_counts: Dict) -> Dict:
     trends = {
-        "labels": ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul'],
+        "labels": [],
         "water_quality": [],
         "air_quality": []
     }
-    
+
     # Calculate trend based on conservation efforts vs pollution reports
-    for i in range(7):
-        month_start = datetime.utcnow() - timedelta(days=30 * (7-i))
-        month_end = datetime.utcnow() - timedelta(days=30 * (6-i))
-        
-        month_pollution = db.query(Report).filter(
-            Report.threat_type == 'pollution',
-            Report.created_at >= month_start,
-            Report.created_at < month_end
-        ).count()
-        
-        month_conservation = db.query(Report).filter(
-            Report.validated == True,
-            Report.created_at >= month_start, 
-            Report.created_at < month_end
-        ).count()
-        
+    for i, (month, month_counts) in enumerate(monthly_counts.items()):
+        month_pollution = sum(n for threat_type, _, n in month_counts if threat_type == 'pollution')
+        month_conservation = sum(n for _, validated, n in month_counts if validated)
+
         # Water quality improves with conservation, degrades with pollution
         base_water = 70 + i * 2  # Gradual improvement trend
         water_adjustment = (month_conservation * 3) - (month_pollution * 2)
         water_quality = max(60, min(90, base_water + water_adjustment))
-        
+
         # Air quality follows similar pattern but less volatile
         base_air = 65 + i * 1.5
         air_adjustment = (month_conservation * 2) - (month_pollution * 1.5)
         air_quality = max(55, min(85, base_air + air_adjustment))
-        
+
+        trends["labels"].append(datetime.strptime(month, "%Y-%m").strftime("%b"))
         trends["water_quality"].append(int(water_quality))
         trends["air_quality"].append(int(air_quality))
-    
+
     return trends
 
-@router.get("/biodiversity-data")
-def get_biodiversity_data(db: Session = Depends(get_db)):
-    """Get biodiversity distribution data"""
-    
-    # Calculate biodiversity based on conservation success
-    total_reports = db.query(Report).filter(Report.validated == True).count()
-    
+def biodiversity_data(validated_reports: int) -> Dict:
     # Base biodiversity distribution adjusted by conservation efforts
     base_distribution = {
         "Birds": 35,
-        "Fish": 30, 
+        "Fish": 30,
         "Plants": 20,
         "Mammals": 10,
         "Others": 5
     }
-    
+
     # Adjust based on conservation success (more reports = better biodiversity)
-    multiplier = 1 + min(total_reports / 100, 0.8)  # Up to 80% increase
-    
+    multiplier = 1 + min(validated_reports / 100, 0.8)  # Up to 80% increase
+
     biodiversity = {}
     for category, percentage in base_distribution.items():
         biodiversity[category] = int(percentage * multiplier)
-    
+
     return {
         "labels": list(biodiversity.keys()),
         "data": list(biodiversity.values())
     }
 
-@router.get("/monitoring-stations")
-def get_monitoring_stations(db: Session = Depends(get_db)):
-    """Get monitoring station status from zones data"""
-    
-    zones = db.query(Zone).limit(4).all()
-    
+def monitoring_stations(zones: List) -> List[Dict]:
+    """`zones`: (id, name, coordinates) of up to four zones"""
     if not zones:
         # Default stations if no zones exist
-        stations = [
+        return [
             {"name": "Sundarbans-01", "location": "West Bengal", "status": "Online", "last_reading": "2 hours ago"},
             {"name": "Bhitarkanika-02", "location": "Odisha", "status": "Online", "last_reading": "1 hour ago"},
             {"name": "Pichavaram-03", "location": "Tamil Nadu", "status": "Maintenance", "last_reading": "6 hours ago"},
             {"name": "Coringa-04", "location": "Andhra Pradesh", "status": "Online", "last_reading": "30 minutes ago"}
         ]
-        return stations
-    
+
     stations = []
     statuses = ['Online', 'Online', 'Maintenance', 'Online']
     readings = ['2 hours ago', '1 hour ago', '6 hours ago', '30 minutes ago']
-    
-    for i, zone in enumerate(zones):
+
+    for i, (zone_id, name, coordinates) in enumerate(zones):
         stations.append({
-            "name": f"{zone.name}-{i+1:02d}",
-            "location": zone.location or f"Zone {zone.id}",
+            "name": f"{name}-{i+1:02d}",
+            "location": coordinates or f"Zone {zone_id}",
             "status": statuses[i % len(statuses)],
             "last_reading": readings[i % len(readings)]
         })
-    
+
     return stations
 
-@router.get("/species-trends")
-def get_species_trends(db: Session = Depends(get_db)):
-    """Get species population trend data"""
-    
-    # Calculate trends based on conservation vs threat reports
-    conservation_reports = db.query(Report).filter(
-        Report.validated == True,
-        Report.created_at >= datetime.utcnow() - timedelta(days=365)
-    ).count()
-    
-    threat_reports = db.query(Report).filter(
-        Report.threat_type.in_(['illegal_cutting', 'pollution', 'overfishing']),
-        Report.created_at >= datetime.utcnow() - timedelta(days=365)
-    ).count()
-    
+def species_trends(conservation_reports: int, threat_reports: int) -> Dict:
     # Species trend calculations
     conservation_impact = conservation_reports * 0.5
     threat_impact = threat_reports * 0.3
-    
+
     birds_trend = max(-15, min(20, conservation_impact - threat_impact + random.randint(-3, 5)))
     fish_trend = max(-10, min(15, (conservation_impact * 0.8) - (threat_impact * 1.2) + random.randint(-2, 3)))
     plants_trend = max(-5, min(25, (conservation_impact * 1.2) - (threat_impact * 0.8) + random.randint(0, 8)))
-    
+
     return {
         "birds": {
             "count": 87,
             "trend": round(birds_trend, 1)
         },
         "fish": {
-            "count": 156, 
+            "count": 156,
             "trend": round(fish_trend, 1)
         },
         "plants": {
             "count": 34,
             "trend": round(plants_trend, 1)
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/summary")
+@query_budget(1)
+@single_flight
+@cached_response("reports", "zones")
+def get_ecosystem_summary(months: int = Query(7, ge=1, le=36), db: Session = Depends(get_db)):
+    """Every ecosystem page payload, read in one statement"""
+    last_90_days = Report.created_at >= datetime.utcnow() - timedelta(days=90)
+    last_year = Report.created_at >= datetime.utcnow() - timedelta(days=365)
+    keys = month_keys(months)
+
+    first_zones = select(Zone.id, Zone.name, Zone.coordinates).limit(4).subquery()
+    row = counts(
+        db,
+        tally(
+            Report,
+            pollution=count_where(Report.threat_type == 'pollution', last_90_days),
+            validated=count_where(Report.validated == True),
+            conservation=count_where(Report.validated == True, Report.threat_type.in_(RESTORATION_THREATS)),
+            destruction=count_where(Report.threat_type.in_(DESTRUCTION_THREATS)),
+            validated_last_year=count_where(Report.validated == True, last_year),
+            threats_last_year=count_where(Report.threat_type.in_(SPECIES_THREATS), last_year),
+        ),
+        monthly=monthly_report_counts_json(keys),
+        zones=select(func.json_group_array(func.json_array(first_zones.c.id, first_zones.c.name, first_zones.c.coordinates)))
+            .scalar_subquery(),
+    )
+
+    return {
+        "health_metrics": health_metrics(row.pollution, row.validated, row.conservation, row.destruction),
+        "environmental_trends": environmental_trends(decode_monthly_report_counts(keys, row.monthly)),
+        "biodiversity_data": biodiversity_data(row.validated),
+        "species_trends": species_trends(row.validated_last_year, row.threats_last_year),
+        "monitoring_stations": monitoring_stations(json.loads(row.zones)),
+    }
+
+@router.get("/health-metrics", dependencies=[conditional_get("reports", window=timedelta(hours=1))])
+@query_budget(2)
+@cached_response("reports")
+def get_ecosystem_health_metrics(db: Session = Depends(get_db)):
+    """Get ecosystem health metrics calculated from database data"""
+
+    row = counts(
+        db,
+        tally(
+            Report,
+            # Water quality: pollution reports (inverse relationship)
+            pollution=count_where(
+                Report.threat_type == 'pollution',
+                Report.created_at >= datetime.utcnow() - timedelta(days=90)
+            ),
+            validated=count_where(Report.validated == True),
+            # Forest cover: conservation vs destruction reports
+            conservation=count_where(Report.validated == True, Report.threat_type.in_(RESTORATION_THREATS)),
+            destruction=count_where(Report.threat_type.in_(DESTRUCTION_THREATS)),
+        ),
+    )
+
+    return health_metrics(row.pollution, row.validated, row.conservation, row.destruction)
+
+@router.get("/environmental-trends")
+@single_flight
+@cached_response("reports")
+def get_environmental_trends(months: int = Query(7, ge=1, le=36), db: Session = Depends(get_db)):
+    """Get environmental trend data based on report history"""
+
+    # One read of the monthly rollup covers every month in the window
+    return environmental_trends(monthly_report_counts(db, months))
+
+@router.get("/biodiversity-data")
+@cached_response("reports")
+def get_biodiversity_data(db: Session = Depends(get_db)):
+    """Get biodiversity distribution data"""
+
+    # Calculate biodiversity based on conservation success
+    validated_reports = db.query(Report).filter(Report.validated == True).count()
+    return biodiversity_data(validated_reports)
+
+@router.get("/monitoring-stations")
+@cached_response("zones")
+def get_monitoring_stations(db: Session = Depends(get_db)):
+    """Get monitoring station status from zones data"""
+
+    zones = db.query(Zone.id, Zone.name, Zone.coordinates).limit(4).all()
+    return monitoring_stations(zones)
+
+@router.get("/species-trends")
+@query_budget(1)
+@cached_response("reports")
+def get_species_trends(db: Session = Depends(get_db)):
+    """Get species population trend data"""
+
+    # Calculate trends based on conservation vs threat reports
+    last_year = Report.created_at >= datetime.utcnow() - timedelta(days=365)
+    row = counts(
+        db,
+        conservation=count_of(Report, Report.validated == True, last_year),
+        threats=count_of(Report, Report.threat_type.in_(SPECIES_THREATS), last_year),
+    )
+
+    return species_trends(row.conservation, row.threats)
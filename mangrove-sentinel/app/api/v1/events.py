@@ -5,18 +5,27 @@ from typing import List, Dict
 from datetime import datetime, timedelta
 import random
 
+from app.core.query_budget import query_budget
+from app.core.response_cache import cached_response
+from app.database.aggregates import count_of, counts
 from app.database.base import get_db
 from app.database.models import User, Report, Alert
 
 router = APIRouter()
 
 @router.get("/stats")
+@query_budget(1)
+@cached_response("reports", "users")
 def get_events_stats(db: Session = Depends(get_db)):
     """Get events statistics"""
     
     # Calculate stats based on user and report activity
-    active_users = db.query(User).filter(User.is_active == True).count()
-    total_reports = db.query(Report).count()
+    row = counts(
+        db,
+        active_users=count_of(User, User.is_active == True),
+        total_reports=count_of(Report),
+    )
+    active_users, total_reports = row.active_users, row.total_reports
     
     # Estimate event metrics
     upcoming_events = min(15, max(8, active_users // 50))
@@ -32,6 +41,8 @@ def get_events_stats(db: Session = Depends(get_db)):
     }
 
 @router.get("/upcoming")
+@query_budget(2)
+@cached_response("alerts", "reports")
 def get_upcoming_events(db: Session = Depends(get_db)):
     """Get upcoming events based on current needs and reports"""
     
@@ -114,6 +125,7 @@ def get_upcoming_events(db: Session = Depends(get_db)):
     return events
 
 @router.get("/past-highlights")
+@cached_response("reports")
 def get_past_event_highlights(db: Session = Depends(get_db)):
     """Get past event highlights based on successful reports"""
     
@@ -178,7 +190,7 @@ def get_past_event_highlights(db: Session = Depends(get_db)):
             # Default data for remaining events
             default_locations = ["Pichavaram", "Sundarbans", "Bhitarkanika"]
             location_name = default_locations[i % len(default_locations)]
-            description = event_type["description_template"].format(location=location_name)
+            description = event_type["description_template"].format(trees="2,000", location=location_name)
             participants = "Multiple participants"
             event_date = datetime.utcnow() - timedelta(days=30 + (i * 20))
         
@@ -193,22 +205,21 @@ def get_past_event_highlights(db: Session = Depends(get_db)):
     return highlights
 
 @router.get("/categories")
+@query_budget(1)
+@cached_response("reports")
 def get_event_categories(db: Session = Depends(get_db)):
     """Get event categories with counts based on database activity"""
     
     # Count different types of activity to suggest event categories
-    total_reports = db.query(Report).count()
-    conservation_reports = db.query(Report).filter(
-        Report.threat_type.in_(['restoration', 'conservation'])
-    ).count()
-    
-    research_activity = db.query(Report).filter(
-        Report.validated == True
-    ).count()
-    
-    educational_needs = db.query(Report).filter(
-        Report.validated == False
-    ).count()
+    row = counts(
+        db,
+        total_reports=count_of(Report),
+        conservation_reports=count_of(Report, Report.threat_type.in_(['restoration', 'conservation'])),
+        research_activity=count_of(Report, Report.validated == True),
+        educational_needs=count_of(Report, Report.validated == False),
+    )
+    total_reports, conservation_reports = row.total_reports, row.conservation_reports
+    research_activity, educational_needs = row.research_activity, row.educational_needs
     
     categories = [
         {"name": "Conservation", "icon": "🌱", "description": "Tree planting and habitat restoration", "count": max(5, conservation_reports)},
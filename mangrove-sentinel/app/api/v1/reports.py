@@ -1,14 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from datetime import datetime
+import json
+import tempfile
 
+from app.core.broadcast import publish_with_stats
+from app.core.export import export_response
+from app.core.geo import parse_bbox
+from app.core.ndjson import MAX_LINE_BYTES, InvalidBody, is_gzip, iter_lines
+from app.core.pagination import keyset_paginate
+from app.core.query_budget import query_budget
 from app.database.base import get_db
-from app.database.models import Report, User, Dashboard
-from app.database.schemas import Report as ReportSchema, ReportCreate, ReportBase
+from app.database.clusters import report_clusters
+from app.database.models import Report, User
+from app.database.schemas import Report as ReportSchema, ReportCreate, ReportBase, ReportPage, UserReportPage, NearbyReport, ReportClusters, ReportSearchResult
+from app.database.search import fts_table, match_expression, rank, reports_fts, snippet, window_floor
+from app.database.zone_index import get_zone_index
+from app.database.spatial import NEARBY_MAX_ROUNDS, bbox_is_dense, filter_bbox, nearest_reports
 from app.auth.dependencies import get_current_active_user
 
 router = APIRouter()
 
+BULK_BATCH_SIZE = 500
+# Per-record results stay in memory up to this size, then spill to disk
+BULK_RESULTS_IN_MEMORY = 1024 * 1024
+
+def filter_reports(
+    query,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    validated: Optional[bool] = None
+):
+    if threat_type is not None:
+        query = query.filter(Report.threat_type == threat_type)
+    if severity is not None:
+        query = query.filter(Report.severity == severity)
+    if status is not None:
+        query = query.filter(Report.status == status)
+    if validated is not None:
+        query = query.filter(Report.validated == validated)
+    return query
+
+def filter_period(query, since: Optional[datetime] = None, until: Optional[datetime] = None):
+    if since is not None:
+        query = query.filter(Report.created_at >= since)
+    if until is not None:
+        query = query.filter(Report.created_at < until)
+    return query
+
 @router.post("/", response_model=ReportSchema)
 def create_report(
     report_data: ReportBase,
@@ -24,10 +70,218 @@ def create_report(
     db.refresh(db_report)
     return db_report
 
-@router.get("/", response_model=List[ReportSchema])
-def get_reports(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reports = db.query(Report).offset(skip).limit(limit).all()
-    return reports
+def _record_error(line: int, errors: list) -> dict:
+    return {"line": line, "status": "error", "errors": errors}
+
+def _parse_record(line: int, raw: Optional[bytes]):
+    """A validated ReportBase for one NDJSON line, or the error result for it"""
+    if raw is None:
+        return None, _record_error(line, [{"msg": f"Line longer than {MAX_LINE_BYTES} bytes"}])
+    try:
+        return ReportBase.model_validate(json.loads(raw)), None
+    except ValueError as e:
+        if isinstance(e, ValidationError):
+            return None, _record_error(line, e.errors(include_url=False, include_context=False, include_input=False))
+        return None, _record_error(line, [{"msg": f"Invalid JSON: {e}"}])
+
+@router.post("/bulk")
+@query_budget(None, batched=True)
+async def bulk_create_reports(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create reports from an NDJSON body, one ReportBase object per line,
+    optionally sent with `Content-Encoding: gzip`.
+
+    The body is read and validated as it streams in and valid records are
+    inserted BULK_BATCH_SIZE per transaction, so memory stays flat however
+    large the upload. The response is NDJSON: one result per line of input
+    ({"line", "status": "created", "id"} or {"line", "status": "error",
+    "errors"}), in input order, then a {"summary": ...} line.
+    """
+    results = tempfile.SpooledTemporaryFile(max_size=BULK_RESULTS_IN_MEMORY)
+    summary = {"received": 0, "created": 0, "failed": 0}
+    batch, batch_results = [], []
+
+    def insert_batch():
+        """Insert the pending batch in one transaction; runs in the threadpool"""
+        # Core executemany: one prepared statement for the batch, so the
+        # ORM's zone hook is applied here instead
+        zones = get_zone_index(db.connection())
+        rows = [
+            {**record.dict(), "reporter_id": current_user.id, "zone_id": zones.locate(record.latitude, record.longitude)}
+            for _, record in batch
+        ]
+        try:
+            # RETURNING in parameter order gives each row its own id
+            ids = db.scalars(insert(Report).returning(Report.id, sort_by_parameter_order=True), rows).all()
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            for line, _ in batch:
+                batch_results.append(_record_error(line, [{"msg": "Could not be saved"}]))
+            summary["failed"] += len(rows)
+            return
+        for (line, _), report_id in zip(batch, ids):
+            batch_results.append({"line": line, "status": "created", "id": report_id})
+        summary["created"] += len(rows)
+
+    async def flush_batch():
+        if batch:
+            await run_in_threadpool(insert_batch)
+        batch_results.sort(key=lambda result: result["line"])
+        for result in batch_results:
+            results.write(json.dumps(result).encode() + b"\n")
+        batch.clear()
+        batch_results.clear()
+
+    try:
+        async for line, raw in iter_lines(request.stream(), gzip=is_gzip(request.headers.get("content-encoding"))):
+            summary["received"] += 1
+            record, error = _parse_record(line, raw)
+            if error:
+                summary["failed"] += 1
+                batch_results.append(error)
+            else:
+                batch.append((line, record))
+            if len(batch) >= BULK_BATCH_SIZE:
+                await flush_batch()
+    except InvalidBody as e:
+        summary["error"] = str(e)
+    await flush_batch()
+
+    results.write(json.dumps({"summary": summary}).encode() + b"\n")
+    results.seek(0)
+
+    def stream_results():
+        with results:
+            yield from iter(lambda: results.read(64 * 1024), b"")
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/", response_model=ReportPage)
+def get_reports(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    validated: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    query = filter_reports(db.query(Report), threat_type, severity, status, validated)
+    reports, next_cursor = keyset_paginate(query, Report, cursor, limit)
+    return {"items": reports, "next_cursor": next_cursor}
+
+EXPORT_COLUMNS = [
+    Report.id, Report.title, Report.description, Report.location, Report.latitude, Report.longitude,
+    Report.threat_type, Report.severity, Report.status, Report.validated, Report.created_at,
+    Report.updated_at, Report.reporter_id, Report.zone_id,
+]
+
+@router.get("/export")
+@query_budget(None, batched=True)
+def export_reports(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    validated: Optional[bool] = None
+):
+    """Every report matching the listing filters, streamed as CSV or NDJSON (optionally gzip-compressed)"""
+    return export_response(
+        Report, EXPORT_COLUMNS,
+        lambda query: filter_reports(query, threat_type, severity, status, validated),
+        "reports", format, gzip,
+    )
+
+@router.get("/bbox", response_model=List[ReportSchema])
+def get_reports_in_bbox(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    validated: Optional[bool] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Newest reports inside a bounding box"""
+    box = parse_bbox(bbox)
+    query = filter_bbox(db.query(Report), box, use_rtree=not bbox_is_dense(db, box))
+    query = filter_period(filter_reports(query, threat_type, severity, None, validated), since, until)
+    return query.order_by(Report.created_at.desc(), Report.id.desc()).limit(limit).all()
+
+@router.get("/nearby", response_model=List[NearbyReport])
+@query_budget(NEARBY_MAX_ROUNDS + 1, max_repeats=NEARBY_MAX_ROUNDS)
+def get_reports_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    validated: Optional[bool] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Closest reports within `radius_km` of a point, nearest first"""
+    query = filter_reports(db.query(Report.id, Report.latitude, Report.longitude), threat_type, severity, None, validated)
+    nearest = nearest_reports(filter_period(query, since, until), lat, lng, radius_km, limit)
+    if not nearest:
+        return []
+
+    reports = {report.id: report for report in db.query(Report).filter(Report.id.in_([report_id for report_id, _ in nearest]))}
+    return [
+        NearbyReport(**ReportSchema.model_validate(reports[report_id]).model_dump(), distance_km=round(distance, 3))
+        for report_id, distance in nearest
+    ]
+
+@router.get("/search", response_model=List[ReportSearchResult])
+@query_budget(2)
+def search_reports(
+    q: str = Query(..., min_length=1, max_length=200),
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    validated: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Reports matching every word of `q`, best match first, with a highlighted
+    snippet. Relevance is ranked among the newest SEARCH_WINDOW matches.
+    """
+    score = rank().label("score")
+    query = db.query(Report, score, snippet().label("snippet")) \
+        .select_from(reports_fts).join(Report, Report.id == reports_fts.c.rowid) \
+        .filter(fts_table.match(match_expression(q)))
+    query = filter_period(filter_reports(query, threat_type, severity, None, validated), since, until)
+
+    floor = window_floor(query)
+    if floor is not None:
+        query = query.filter(reports_fts.c.rowid >= floor)
+
+    return [
+        # bm25() is lower for better matches; flip it so a higher score ranks higher
+        ReportSearchResult(**ReportSchema.model_validate(report).model_dump(), score=round(-bm25, 4), snippet=fragment)
+        for report, bm25, fragment in query.order_by(score, Report.id.desc()).limit(limit)
+    ]
+
+@router.get("/clusters", response_model=ReportClusters)
+@query_budget(1)
+def get_report_clusters(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
+    db: Session = Depends(get_db)
+):
+    """Report counts per map grid cell, with a severity breakdown, for drawing clusters"""
+    return report_clusters(db, parse_bbox(bbox), zoom)
 
 @router.get("/{report_id}", response_model=ReportSchema)
 def get_report(report_id: int, db: Session = Depends(get_db)):
@@ -37,30 +291,38 @@ def get_report(report_id: int, db: Session = Depends(get_db)):
     return report
 
 @router.put("/{report_id}/validate")
+@query_budget(3)
 def validate_report(report_id: int, db: Session = Depends(get_db)):
-    report = db.query(Report).filter(Report.id == report_id).first()
+    # Load the reporter with the report rather than lazily afterwards
+    report = db.query(Report).options(joinedload(Report.reporter)).filter(Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
     report.validated = True
     report.status = "validated"
+    reporter_id = report.reporter_id
     
     # Award points to reporter
     if report.reporter:
-        report.reporter.points += 10
-    
-    # Update dashboard stats
-    stats = db.query(Dashboard).first()
-    if stats:
-        stats.validated_reports += 1
+        report.reporter.points = User.points + 10
     
     db.commit()
+    publish_with_stats(db, "report.validated", {"id": report_id, "reporter_id": reporter_id})
     return {"message": "Report validated successfully"}
 
-@router.get("/user/my-reports", response_model=List[ReportSchema])
+@router.get("/user/my-reports", response_model=UserReportPage)
 def get_my_reports(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    validated: Optional[bool] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    reports = db.query(Report).filter(Report.reporter_id == current_user.id).all()
-    return reports
\ No newline at end of file
+    query = db.query(Report).filter(Report.reporter_id == current_user.id)
+    query = filter_reports(query, threat_type, severity, status, validated)
+    total = query.count()
+    reports, next_cursor = keyset_paginate(query, Report, cursor, limit)
+    return {"items": reports, "next_cursor": next_cursor, "total": total}
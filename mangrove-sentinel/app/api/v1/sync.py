@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.query_budget import query_budget
+from app.database.base import get_db
+from app.database.schemas import SyncChanges
+from app.database.sync import changes_since, decode_sync_token, encode_sync_token
+
+router = APIRouter()
+
+@router.get("/", response_model=SyncChanges)
+@query_budget(4)
+def sync_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_db)
+):
+    """
+    Reports, alerts and zones created or updated since `since` (a token from
+    a previous response; omit it for a first full sync), plus tombstones for
+    rows deleted since. Resolved alerts come back as updated rows with
+    is_active false. Call again with `next_token` while `has_more` is true.
+    """
+    changed, deleted, last_seq, has_more = changes_since(db, decode_sync_token(since), limit)
+    return {
+        "reports": changed["report"],
+        "alerts": changed["alert"],
+        "zones": changed["zone"],
+        "deleted": deleted,
+        "next_token": encode_sync_token(last_seq),
+        "has_more": has_more,
+    }
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database.base import get_db
+from app.database.base import get_db, get_async_db
+from app.database.leaderboard import ranks_for
 from app.database.models import User
-from app.database.schemas import User as UserSchema, UserUpdate, UserProfile
+from app.database.schemas import User as UserSchema, UserUpdate, UserProfile, LeaderboardPosition
 from app.auth.dependencies import get_current_active_user
-from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
+from app.core.query_budget import query_budget
 
 router = APIRouter()
 
@@ -15,40 +18,84 @@ def get_user_profile(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.put("/profile", response_model=UserProfile)
-def update_user_profile(
+async def update_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     update_data = user_update.dict(exclude_unset=True)
     
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
     
+    user = await db.get(User, current_user.id)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    await db.commit()
+    await db.refresh(user)
+    return user
 
 @router.get("/leaderboard", response_model=List[UserSchema])
 def get_leaderboard(limit: int = 10, db: Session = Depends(get_db)):
     users = (
         db.query(User)
         .filter(User.is_active == True, User.is_sentinel == True)
-        .order_by(User.points.desc())
+        .order_by(User.points.desc(), User.id)
         .limit(limit)
         .all()
     )
     return users
 
+@router.get("/leaderboard/me", response_model=LeaderboardPosition)
+@query_budget(6)
+def get_my_leaderboard_position(
+    neighbours: int = Query(5, ge=0, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """The current sentinel's rank and the `neighbours` sentinels either side of them"""
+    if not current_user.is_sentinel:
+        raise HTTPException(status_code=404, detail="Only sentinels are ranked")
+    
+    points, user_id = current_user.points or 0, current_user.id
+    ranked = db.query(User.id, User.full_name, User.points).filter(User.is_active == True, User.is_sentinel == True)
+    
+    # Leaderboard order is points descending, then id; ties are walked first
+    above, below = [], []
+    if neighbours:
+        above = ranked.filter(User.points == points, User.id < user_id) \
+            .order_by(User.id.desc()).limit(neighbours).all()
+        if len(above) < neighbours:
+            above += ranked.filter(User.points > points) \
+                .order_by(User.points.asc(), User.id.desc()).limit(neighbours - len(above)).all()
+        below = ranked.filter(User.points == points, User.id > user_id) \
+            .order_by(User.id).limit(neighbours).all()
+        if len(below) < neighbours:
+            below += ranked.filter(User.points < points) \
+                .order_by(User.points.desc(), User.id).limit(neighbours - len(below)).all()
+    above.reverse()
+    
+    ranks, total = ranks_for(db, [points, *(row.points for row in above + below)])
+    def entry(row):
+        return {"id": row.id, "full_name": row.full_name, "points": row.points, "rank": ranks[row.points]}
+    
+    return {
+        "rank": ranks[points],
+        "points": points,
+        "total": total,
+        "above": [entry(row) for row in above],
+        "below": [entry(row) for row in below],
+    }
+
 @router.put("/points")
 def award_points(
     points: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    current_user.points += points
+    user = db.get(User, current_user.id)
+    # Increment in SQL so concurrent awards cannot overwrite each other
+    user.points = User.points + points
     db.commit()
-    return {"message": f"Awarded {points} points", "total_points": current_user.points}
\ No newline at end of file
+    return {"message": f"Awarded {points} points", "total_points": user.points}
\ No newline at end of file
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.core.conditional import conditional_get
+from app.core.geo import BBox
+from app.core.pagination import keyset_paginate
 from app.database.base import get_db
-from app.database.models import Zone
-from app.database.schemas import Zone as ZoneSchema, ZoneCreate
+from app.database.models import Report, Zone
+from app.database.schemas import Zone as ZoneSchema, ZoneCreate, ReportPage
+from app.database.zone_index import reassign_report_zones, zone_geometry_from_centre
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ZoneSchema])
+@router.get("/", response_model=List[ZoneSchema], dependencies=[conditional_get("zones")])
 def get_zones(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     zones = db.query(Zone).offset(skip).limit(limit).all()
     return zones
@@ -20,15 +24,38 @@ def get_zone(zone_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Zone not found")
     return zone
 
+@router.get("/{zone_id}/reports", response_model=ReportPage)
+def get_zone_reports(
+    zone_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Reports inside the zone, newest first (uses the zone_id index)"""
+    query = db.query(Report).filter(Report.zone_id == zone_id)
+    reports, next_cursor = keyset_paginate(query, Report, cursor, limit)
+    return {"items": reports, "next_cursor": next_cursor}
+
 @router.post("/", response_model=ZoneSchema)
 def create_zone(zone: ZoneCreate, db: Session = Depends(get_db)):
-    db_zone = Zone(**zone.dict())
+    polygon = zone.polygon or zone_geometry_from_centre(zone.coordinates, zone.area_size)
+    if polygon is not None and (len(polygon) < 3 or any(len(point) != 2 for point in polygon)):
+        raise HTTPException(status_code=400, detail="polygon must be at least three [lng, lat] points")
+    if polygon is not None and not all(-180 <= lng <= 180 and -90 <= lat <= 90 for lng, lat in polygon):
+        raise HTTPException(status_code=400, detail="polygon points must have -180 <= lng <= 180 and -90 <= lat <= 90")
+
+    db_zone = Zone(**zone.dict(exclude={"polygon"}), polygon=polygon)
     db.add(db_zone)
     db.commit()
     db.refresh(db_zone)
+
+    # Existing reports inside the new boundary may now belong to it
+    if polygon is not None:
+        bbox = BBox(db_zone.min_lng, db_zone.min_lat, db_zone.max_lng, db_zone.max_lat)
+        reassign_report_zones(db.get_bind(), bbox)
     return db_zone
 
 @router.get("/high-risk/count")
 def get_high_risk_zones_count(db: Session = Depends(get_db)):
     count = db.query(Zone).filter(Zone.risk_level == "high").count()
-    return {"high_risk_zones": count}
\ No newline at end of file
+    return {"high_risk_zones": count}
@@ -0,0 +1,62 @@
+"""
+Cache of decoded access tokens and the users they resolve to.
+
+`get_current_user` consults it before decoding the JWT or querying `users`.
+Cached users are detached snapshots: fine to read, but handlers that modify
+the user must load it into their own session first. Entries are dropped
+whenever a session commits a change to a `User` row (profile edits, point
+awards, deactivation), and otherwise expire after AUTH_CACHE_TTL_SECONDS.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database.models import User
+
+# token -> email, kept no longer than the token itself is valid
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+# email -> detached User snapshot
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def get_token_subject(token: str) -> Optional[str]:
+    return token_cache.get(token)
+
+def cache_token_subject(token: str, email: str, expires_at: Optional[float]):
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        token_cache.set(token, email, ttl=ttl)
+
+def get_cached_user(email: str) -> Optional[User]:
+    return user_cache.get(email)
+
+def cache_user(user: User) -> User:
+    """Store and return a detached copy of `user` that no session will expire"""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    user_cache.set(user.email, snapshot)
+    return snapshot
+
+def invalidate_user(email: str):
+    user_cache.pop(email)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_emails", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for email in session.info.pop("changed_user_emails", ()):
+        invalidate_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_emails", None)
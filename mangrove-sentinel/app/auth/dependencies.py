@@ -1,9 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.security import verify_token
+from app.core.security import decode_access_token
 from app.database.base import get_db
 from app.database.models import User
+from app.auth.cache import get_token_subject, cache_token_subject, get_cached_user, cache_user
 
 security = HTTPBearer()
 
@@ -18,16 +19,26 @@ def get_current_user(
     )
     
     token = credentials.credentials
-    email = verify_token(token)
+    email = get_token_subject(token)
     
     if email is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None or payload.get("sub") is None:
+            raise credentials_exception
+        email = payload["sub"]
+        cache_token_subject(token, email, payload.get("exp"))
+    
+    # Cached users are detached snapshots; load the user into the request
+    # session before modifying it
+    user = get_cached_user(email)
+    if user is not None:
+        return user
         
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
         
-    return user
+    return cache_user(user)
 
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -0,0 +1,116 @@
+"""
+In-process fan-out of live events to Server-Sent Event streams.
+
+Write handlers call `broadcaster.publish(...)` after they commit; every
+connected stream has its own queue on the event loop and receives each
+event once. Publishing is thread-safe (sync handlers run on the
+threadpool) and costs one append plus one loop callback, however many
+streams are connected. An idle stream is a coroutine parked on its queue,
+so thousands of them cost memory but no CPU.
+
+Recent events are kept (with increasing ids) so a client that reconnects
+with `Last-Event-ID` is sent what it missed. Events are only seen by
+streams connected to the same process as the writer.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.database.models import Dashboard
+from app.database.schemas import DashboardStats
+
+HISTORY_SIZE = 256
+QUEUE_SIZE = 64
+STATS_TTL_SECONDS = 1
+
+# The latest dashboard counters, as sent to newly connected streams
+stats_cache = TTLCache(maxsize=1, ttl=STATS_TTL_SECONDS)
+
+class Event:
+    __slots__ = ("id", "name", "data")
+
+    def __init__(self, id: int, name: str, data: str):
+        self.id = id
+        self.name = name
+        self.data = data
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.name}\ndata: {self.data}\n\n".encode()
+
+class Broadcaster:
+    def __init__(self, history_size: int = HISTORY_SIZE, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._last_id = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def listening(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, name: str, data: dict):
+        """Record an event and deliver it to every connected stream; callable from any thread"""
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, name, json.dumps(data, default=str))
+            self._history.append(event)
+            loop = self._loop
+        if loop is not None and self._subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, event)
+            except RuntimeError:
+                # The loop has shut down
+                pass
+
+    def _deliver(self, event: Event):
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.queue_size:
+                # The client isn't keeping up: end its stream, it reconnects and replays
+                self._subscribers.discard(queue)
+                queue.put_nowait(None)
+            else:
+                queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """A queue of events (None when the stream should end); call on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def history_since(self, last_id: int) -> Optional[List[Event]]:
+        """Events after `last_id`, or None if some were dropped (or `last_id` predates a restart)"""
+        with self._lock:
+            events = list(self._history)
+            current = self._last_id
+        if last_id == current:
+            return []
+        if last_id > current or not events or events[0].id > last_id + 1:
+            return None
+        return [event for event in events if event.id > last_id]
+
+broadcaster = Broadcaster()
+
+def publish_with_stats(db: Session, name: str, data: dict):
+    """
+    Publish `name`, then the dashboard counters as the just-committed write
+    left them (triggers keep them in step). The counters are only read
+    while someone is listening.
+    """
+    broadcaster.publish(name, data)
+    if broadcaster.listening:
+        stats = db.query(Dashboard).first()
+        if stats:
+            payload = DashboardStats.model_validate(stats).model_dump(mode="json")
+            stats_cache.set("stats", payload)
+            broadcaster.publish("stats", payload)
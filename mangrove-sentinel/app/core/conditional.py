@@ -0,0 +1,78 @@
+"""
+Conditional GET for responses derived from whole tables.
+
+    @router.get("/stats", dependencies=[conditional_get("reports", "users")])
+
+The dependency reads the tables' versions (app/database/versions.py) and
+either answers 304 Not Modified straight away, before the handler runs, or
+adds ETag / Last-Modified to the handler's response. Routes whose answer
+also drifts with the clock (e.g. "reports in the last 90 days") pass a
+`window`: validators then change at least once per window even without
+writes. `async def` routes on an AsyncSession use `async_conditional_get`,
+which reads the versions through `get_async_db` instead of tying up a
+threadpool slot and a second, sync connection.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.base import get_async_db, get_db
+from app.database.versions import async_table_versions, table_versions
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags or "*" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+        return last_modified <= since
+    return False
+
+def _validate(request: Request, response: Response, tables, window: Optional[timedelta], versions):
+    """Answer 304 when the client's validators still match, else add them to `response`"""
+    last_modified = max((updated_at for _, updated_at in versions.values()), default=datetime(1970, 1, 1))
+    last_modified = last_modified.replace(microsecond=0)
+    period = ""
+    if window is not None:
+        seconds = int(window.total_seconds())
+        started = int(time.time()) // seconds * seconds
+        last_modified = max(last_modified, datetime.utcfromtimestamp(started))
+        period = str(started)
+
+    marker = f"{settings.VERSION}|{request.url.path}|{request.url.query}|{period}|" + ",".join(
+        f"{table}:{versions.get(table, (0,))[0]}" for table in tables
+    )
+    etag = '"' + hashlib.blake2b(marker.encode(), digest_size=8).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, etag, last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+def conditional_get(*tables: str, window: Optional[timedelta] = None):
+    """A route dependency making responses built from `tables` cacheable with validators"""
+    def check(request: Request, response: Response, db: Session = Depends(get_db)):
+        _validate(request, response, tables, window, table_versions(db, tables))
+    return Depends(check)
+
+def async_conditional_get(*tables: str, window: Optional[timedelta] = None):
+    """`conditional_get` for `async def` routes: reads the versions on an AsyncSession"""
+    async def check(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        _validate(request, response, tables, window, await async_table_versions(db, tables))
+    return Depends(check)
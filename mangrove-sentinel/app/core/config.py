@@ -8,17 +8,35 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./mangrove_sentinel.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL on aiosqlite
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing (changing BCRYPT_ROUNDS rehashes passwords on next login)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    
+    # Authenticated-user cache
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    
+    # SQL query budgets: "off", "warn" (log) or "raise" (fail the request)
+    QUERY_BUDGET_MODE: str = "off"
+    QUERY_REPEAT_THRESHOLD: int = 3
+    
     # API
     API_V1_STR: str = "/api/v1"
     
     class Config:
         env_file = ".env"
         case_sensitive = True
+    
+    def model_post_init(self, __context):
+        if self.ASYNC_DATABASE_URL is None:
+            self.ASYNC_DATABASE_URL = self.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import math
+from typing import NamedTuple
+
+from fastapi import HTTPException
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+class BBox(NamedTuple):
+    min_lng: float
+    min_lat: float
+    max_lng: float
+    max_lat: float
+
+def parse_bbox(value: str) -> BBox:
+    """Parse "min_lng,min_lat,max_lng,max_lat" (GeoJSON order)"""
+    try:
+        bbox = BBox(*(float(part) for part in value.split(",")))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid bbox, expected min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= bbox.min_lng <= bbox.max_lng <= 180 and -90 <= bbox.min_lat <= bbox.max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bbox, expected min_lng,min_lat,max_lng,max_lat")
+    return bbox
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def radius_bbox(lat: float, lng: float, radius_km: float) -> BBox:
+    """Smallest lat/lng box containing the circle (clamped at the poles and the antimeridian)"""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    d_lng = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+    return BBox(
+        max(-180.0, lng - d_lng),
+        max(-90.0, lat - d_lat),
+        min(180.0, lng + d_lng),
+        min(90.0, lat + d_lat),
+    )
+
+# Polygons are a single outer ring of [lng, lat] pairs (GeoJSON order)
+
+def polygon_bounds(ring) -> BBox:
+    lngs = [point[0] for point in ring]
+    lats = [point[1] for point in ring]
+    return BBox(min(lngs), min(lats), max(lngs), max(lats))
+
+def polygon_area(ring) -> float:
+    """Planar (shoelace) area in square degrees; only used to rank overlapping zones"""
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2
+
+def point_in_polygon(lng: float, lat: float, ring) -> bool:
+    """Even-odd ray casting"""
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > lat) != (y2 > lat) and lng < (x2 - x1) * (lat - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+def square_polygon(lat: float, lng: float, area_km2: float):
+    """A square ring of `area_km2` centred on a point"""
+    half_km = math.sqrt(area_km2) / 2
+    box = radius_bbox(lat, lng, half_km)
+    return [
+        [box.min_lng, box.min_lat],
+        [box.max_lng, box.min_lat],
+        [box.max_lng, box.max_lat],
+        [box.min_lng, box.max_lat],
+    ]
@@ -0,0 +1,85 @@
+"""
+Password hashing off the request path.
+
+bcrypt is deliberately slow, so running it inline ties up a threadpool slot
+per login. PasswordHasher sends the work to a small process pool. It admits
+at most PASSWORD_HASH_WORKERS running jobs plus PASSWORD_HASH_QUEUE_LIMIT
+waiting ones, and turns anything beyond that into an immediate 503. A pool
+whose worker died (OOM kill, segfault) is replaced on the next call; the
+requests caught by the crash get the same 503.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import pwd_context, get_password_hash, verify_password
+
+def _unavailable(detail: str) -> HTTPException:
+    return HTTPException(status_code=503, detail=detail, headers={"Retry-After": "1"})
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool so the next call starts a fresh one"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise _unavailable("Too many concurrent sign-ins, please retry shortly")
+        pool = self._get_pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._discard_pool(pool)
+            raise _unavailable("Password hashing is restarting, please retry shortly")
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise _unavailable("Password hashing is restarting, please retry shortly")
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True when the stored hash predates the configured BCRYPT_ROUNDS"""
+        return pwd_context.needs_update(hashed_password)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
@@ -0,0 +1,180 @@
+"""
+Per-route request metrics in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the matched
+route template (`/api/v1/reports/{report_id}`, not the raw path, so label
+cardinality stays bounded). Engines passed to `instrument_engine` add the
+time spent in SQL to whichever request is running the statement. Served at
+GET /metrics by app/main.py.
+
+All recording happens on the event loop thread, so the registry needs no
+locking; only the per-request SQL accumulator is touched from threadpool
+workers, and each request owns its own.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+class SQLTimer:
+    """Statement count and seconds spent in SQL for one request"""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# Copied into threadpool workers by Starlette, so sync handlers see it too
+current_sql_timer: ContextVar[Optional[SQLTimer]] = ContextVar("current_sql_timer", default=None)
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.sql_time: Dict[Tuple[str, str], Histogram] = {}
+        self.sql_queries: Dict[Tuple[str, str], int] = {}
+        self.in_progress: Dict[str, int] = {}
+        # Render extra metric families owned by other modules (e.g. the response cache)
+        self.collectors: List[Callable[[List[str]], None]] = []
+
+    def observe(self, method: str, route: str, status: int, seconds: float, sql: SQLTimer):
+        key = (method, route)
+        self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+        latency.observe(seconds)
+
+        sql_time = self.sql_time.get(key)
+        if sql_time is None:
+            sql_time = self.sql_time[key] = Histogram(SQL_BUCKETS)
+        sql_time.observe(sql.seconds)
+        self.sql_queries[key] = self.sql_queries.get(key, 0) + sql.queries
+
+    def render(self) -> str:
+        lines = []
+
+        lines.append("# HELP http_requests_total Requests handled, by route and status code.")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), value in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {value}')
+
+        lines.append("# HELP http_requests_in_progress Requests currently being handled.")
+        lines.append("# TYPE http_requests_in_progress gauge")
+        for method, value in sorted(self.in_progress.items()):
+            lines.append(f'http_requests_in_progress{{method="{method}"}} {value}')
+
+        _render_histogram(lines, "http_request_duration_seconds", "Request latency in seconds.", self.latency)
+        _render_histogram(lines, "db_time_per_request_seconds", "Seconds spent executing SQL per request.", self.sql_time)
+
+        lines.append("# HELP db_queries_total SQL statements executed, by route.")
+        lines.append("# TYPE db_queries_total counter")
+        for (method, route), value in sorted(self.sql_queries.items()):
+            lines.append(f'db_queries_total{{method="{method}",route="{_escape(route)}"}} {value}')
+
+        for collect in self.collectors:
+            collect(lines)
+
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def _render_histogram(lines, name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = f'method="{method}",route="{_escape(route)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+registry = MetricsRegistry()
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope and scope.get("root_path"):
+        return scope["root_path"]  # a Mount, e.g. /static
+    return "<unmatched>"
+
+class MetricsMiddleware:
+    """Plain ASGI middleware; BaseHTTPMiddleware would add a task per request"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        sql = SQLTimer()
+        token = current_sql_timer.set(sql)
+        in_progress = self.registry.in_progress
+        in_progress[method] = in_progress.get(method, 0) + 1
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress[method] -= 1
+            current_sql_timer.reset(token)
+            self.registry.observe(method, route_label(scope), status, elapsed, sql)
+
+def instrument_engine(engine):
+    """Attribute the engine's statement time to the request that runs it"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        sql = current_sql_timer.get()
+        if sql is not None:
+            sql.queries += 1
+            sql.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        # after_cursor_execute never fires for a failed statement
+        starts = exception_context.connection.info.get("metrics_query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
@@ -0,0 +1,71 @@
+"""
+Incremental NDJSON reading for streamed request bodies.
+
+Lines are produced as soon as they are complete, so memory holds at most one
+chunk of input plus one partial line, however large the upload is. Bodies
+sent with `Content-Encoding: gzip` are inflated chunk by chunk, with the
+inflated size of each step capped so a highly compressed body cannot balloon.
+"""
+import zlib
+from typing import AsyncIterator, Optional, Tuple
+
+MAX_LINE_BYTES = 64 * 1024
+INFLATE_STEP_BYTES = 256 * 1024
+
+class InvalidBody(Exception):
+    pass
+
+def is_gzip(content_encoding: Optional[str]) -> bool:
+    return (content_encoding or "").strip().lower() in ("gzip", "x-gzip")
+
+async def _inflate(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        async for chunk in chunks:
+            while chunk:
+                data = inflater.decompress(chunk, INFLATE_STEP_BYTES)
+                chunk = inflater.unconsumed_tail
+                if data:
+                    yield data
+        data = inflater.flush()
+    except zlib.error:
+        raise InvalidBody("Invalid gzip body")
+    if data:
+        yield data
+
+async def iter_lines(chunks: AsyncIterator[bytes], gzip: bool = False) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Yield (line number, line without its newline) for every non-blank line,
+    numbered from 1. A line longer than MAX_LINE_BYTES is discarded and
+    yields None in place of its content.
+    """
+    if gzip:
+        chunks = _inflate(chunks)
+
+    number = 0
+    pending = b""
+    oversized = False
+    async for chunk in chunks:
+        lines = chunk.split(b"\n")
+        lines[0] = pending + lines[0]
+        pending = lines.pop()
+
+        for line in lines:
+            number += 1
+            if oversized:
+                oversized = False
+                yield number, None
+            elif len(line) > MAX_LINE_BYTES:
+                yield number, None
+            elif line.strip():
+                yield number, line
+
+        if oversized or len(pending) > MAX_LINE_BYTES:
+            # Drop the rest of this line as it arrives
+            oversized = True
+            pending = b""
+
+    if oversized or len(pending) > MAX_LINE_BYTES:
+        yield number + 1, None
+    elif pending.strip():
+        yield number + 1, pending
@@ -0,0 +1,119 @@
+"""
+Per-request SQL query budgets and N+1 detection.
+
+Enabled with QUERY_BUDGET_MODE=warn (staging) or QUERY_BUDGET_MODE=raise
+(tests and check_query_budgets.py); with the default "off" nothing is
+installed. Each request's statements are fingerprinted (literals and IN
+lists collapsed) and counted. A request is flagged when
+
+  * it runs more statements than its route declared with @query_budget, or
+  * one statement shape repeats QUERY_REPEAT_THRESHOLD or more times,
+    the usual sign of a lazy load inside a loop (N+1).
+
+"warn" logs the offending shapes; "raise" also raises QueryBudgetExceeded
+after the response has been sent, so the test client surfaces it.
+"""
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+def query_budget(max_queries: Optional[int], max_repeats: Optional[int] = None, batched: bool = False):
+    """
+    Declare the most SQL statements a route may run, authentication included.
+    Apply beneath the router decorator:
+
+        @router.get("/stats")
+        @query_budget(2)
+        def get_stats(...):
+
+    `max_repeats` allows a deliberately repeated statement (e.g. a search
+    that widens its radius) to run that many times without being flagged.
+    `batched` marks a route that repeats its statements once per batch of
+    the request body (bulk uploads); it is not checked for N+1 patterns and
+    usually has no total budget (`max_queries=None`).
+    """
+    def decorate(endpoint):
+        endpoint.query_budget = max_queries
+        if max_repeats is not None:
+            endpoint.query_max_repeats = max_repeats
+        if batched:
+            endpoint.query_batched = True
+        return endpoint
+    return decorate
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Reduce a statement to its shape, so the same query with other values matches"""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+# Statement shapes run by the current request
+current_query_log: ContextVar[Optional[Counter]] = ContextVar("current_query_log", default=None)
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        log = current_query_log.get()
+        if log is not None:
+            log[fingerprint(statement)] += 1
+
+def check_request(route: str, budget: Optional[int], log: Counter, repeat_threshold: Optional[int]) -> Optional[str]:
+    """Describe what the request did wrong, or return None; a `repeat_threshold` of None skips the N+1 check"""
+    problems = []
+    total = sum(log.values())
+    if budget is not None and total > budget:
+        problems.append(f"ran {total} queries, budget is {budget}")
+    for shape, count in log.most_common():
+        if repeat_threshold is None or count < repeat_threshold:
+            break
+        problems.append(f"repeated {count}x (possible N+1): {shape[:200]}")
+    if not problems:
+        return None
+    return f"{route}: " + "; ".join(problems)
+
+class QueryBudgetMiddleware:
+    def __init__(self, app, mode: str = "warn", repeat_threshold: int = 3):
+        self.app = app
+        self.mode = mode
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = Counter()
+        token = current_query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_log.reset(token)
+
+        route = scope.get("route")
+        if route is None:
+            return
+        budget = getattr(route.endpoint, "query_budget", None)
+        max_repeats = getattr(route.endpoint, "query_max_repeats", None)
+        repeat_threshold = self.repeat_threshold if max_repeats is None else max_repeats + 1
+        if getattr(route.endpoint, "query_batched", False):
+            repeat_threshold = None
+        problem = check_request(f"{scope['method']} {route.path}", budget, log, repeat_threshold)
+        if problem:
+            logger.warning("Query budget: %s", problem)
+            if self.mode == "raise":
+                raise QueryBudgetExceeded(problem)
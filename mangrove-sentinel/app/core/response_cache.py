@@ -0,0 +1,235 @@
+"""
+In-process cache of route responses, invalidated by writes.
+
+    @router.get("/stats")
+    @query_budget(3)
+    @cached_response("reports", "users")
+    def get_stats(db: Session = Depends(get_db)):
+
+Entries are keyed by route, query/path parameters and current user (see
+`route_keyer`), LRU-bounded at
+RESPONSE_CACHE_MAX_ENTRIES, and remember the write generation of every
+table they were computed from. A session that flushes inserts, updates or
+deletes to a table bumps that table's generation when it commits, which
+makes the entries built from it stale; entries also go stale after `ttl`
+seconds, for routes whose answer drifts with the clock. Writes made on a
+bare engine connection, outside a session, are not seen.
+
+A stale entry is recomputed by the first request that finds it; requests
+arriving while that runs are served the stale value (stale-while-
+revalidate), so a burst of traffic after a write costs one recomputation.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, time as time_of_day, timedelta
+from enum import Enum
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import BackgroundTasks, params
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+
+from app.core.metrics import registry as metrics_registry
+
+RESPONSE_CACHE_MAX_ENTRIES = 512
+RESPONSE_CACHE_TTL_SECONDS = 300
+
+class _Entry:
+    __slots__ = ("value", "generations", "expires_at", "refreshing")
+
+    def __init__(self, value: Any, generations: Dict[str, int], expires_at: float):
+        self.value = value
+        self.generations = generations
+        self.expires_at = expires_at
+        self.refreshing = False
+
+class ResponseCache:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # outcome -> count: "hit", "stale" (served while refreshing) and "miss"
+        self.lookups: Dict[str, int] = {"hit": 0, "stale": 0, "miss": 0}
+
+    def invalidate(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def _fresh(self, entry: _Entry) -> bool:
+        return entry.expires_at > time.monotonic() and all(
+            self._generations.get(table, 0) == generation for table, generation in entry.generations.items()
+        )
+
+    def claim(self, key: Hashable, tables: Tuple[str, ...]) -> Tuple[Any, Optional[Dict[str, int]]]:
+        """
+        (cached value, None) when the caller can use the cache, or
+        (None, generations) when it must compute the value and `store` it
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._fresh(entry):
+                    self.lookups["hit"] += 1
+                    return entry.value, None
+                if entry.refreshing:
+                    self.lookups["stale"] += 1
+                    return entry.value, None
+                entry.refreshing = True
+            self.lookups["miss"] += 1
+            return None, {table: self._generations.get(table, 0) for table in tables}
+
+    def release(self, key: Hashable):
+        """Give up a claimed refresh (the computation failed)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refreshing = False
+
+    def store(self, key: Hashable, value: Any, generations: Dict[str, int], ttl: float):
+        with self._lock:
+            self._entries[key] = _Entry(value, generations, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+response_cache = ResponseCache()
+
+def _freeze(value: Any) -> Hashable:
+    """A hashable stand-in for a query/path parameter value"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, time_of_day)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    raise TypeError(f"can't build a cache key from a {type(value).__name__} parameter")
+
+def route_keyer(endpoint: Callable) -> Callable[[tuple, dict], Hashable]:
+    """
+    Build the key function for a route: calls are identified by the route
+    and every query/path parameter, plus the id of any ORM object (the
+    current user) a dependency provides. Database sessions are left out.
+    Raises TypeError up front for parameters that can't be part of a key
+    (Request, Response, other dependencies), since the answer could
+    depend on them.
+    """
+    signature = inspect.signature(endpoint)
+    skipped, by_id = set(), set()
+    for name, parameter in signature.parameters.items():
+        annotation = parameter.annotation
+        if isinstance(annotation, type) and issubclass(annotation, (Session, AsyncSession)):
+            skipped.add(name)
+        elif isinstance(annotation, type) and hasattr(annotation, "__table__"):
+            by_id.add(name)
+        elif isinstance(parameter.default, params.Depends) or (
+            isinstance(annotation, type) and issubclass(annotation, (HTTPConnection, Response, BackgroundTasks))
+        ):
+            raise TypeError(
+                f"{endpoint.__qualname__}: parameter {name!r} can't be part of a route key"
+            )
+    route = (endpoint.__module__, endpoint.__qualname__)
+
+    def key(args: tuple, kwargs: dict) -> Hashable:
+        bound = signature.bind_partial(*args, **kwargs).arguments
+        return route + (tuple(sorted(
+            (name, getattr(value, "id", None) if name in by_id else _freeze(value))
+            for name, value in bound.items() if name not in skipped
+        )),)
+
+    return key
+
+def cached_response(*tables: str, ttl: float = RESPONSE_CACHE_TTL_SECONDS, cache: ResponseCache = response_cache):
+    """Cache a read-only route's return value until one of `tables` is written (or `ttl` passes)"""
+    def decorate(endpoint):
+        route_key = route_keyer(endpoint)
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def cached(*args, **kwargs):
+                key = route_key(args, kwargs)
+                value, generations = cache.claim(key, tables)
+                if generations is None:
+                    return value
+                try:
+                    value = await endpoint(*args, **kwargs)
+                except BaseException:
+                    cache.release(key)
+                    raise
+                cache.store(key, value, generations, ttl)
+                return value
+        else:
+            @functools.wraps(endpoint)
+            def cached(*args, **kwargs):
+                key = route_key(args, kwargs)
+                value, generations = cache.claim(key, tables)
+                if generations is None:
+                    return value
+                try:
+                    value = endpoint(*args, **kwargs)
+                except BaseException:
+                    cache.release(key)
+                    raise
+                cache.store(key, value, generations, ttl)
+                return value
+        return cached
+    return decorate
+
+# Tables written by a session, collected at flush and invalidated once the transaction commits
+_WRITTEN = "response_cache_written_tables"
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_writes(session, flush_context):
+    written = session.info.setdefault(_WRITTEN, set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        written.add(instance.__table__.name)
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_writes(orm_execute_state):
+    # insert(Model) / update(Model) / delete(Model) run through session.execute()
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault(_WRITTEN, set()).add(table.name)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_writes(session):
+    written = session.info.pop(_WRITTEN, None)
+    if written:
+        response_cache.invalidate(written)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop(_WRITTEN, None)
+
+def _render_metrics(lines):
+    lines.append("# HELP response_cache_lookups_total Cached route lookups, by outcome (hit, stale, miss).")
+    lines.append("# TYPE response_cache_lookups_total counter")
+    for outcome, value in response_cache.lookups.items():
+        lines.append(f'response_cache_lookups_total{{outcome="{outcome}"}} {value}')
+    lines.append("# HELP response_cache_entries Responses currently cached.")
+    lines.append("# TYPE response_cache_entries gauge")
+    lines.append(f"response_cache_entries {len(response_cache)}")
+
+metrics_registry.collectors.append(_render_metrics)
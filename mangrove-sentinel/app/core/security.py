@@ -4,7 +4,7 @@ from passlib.context import CryptContext
 from jose import jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -26,11 +26,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_token(token: str) -> Optional[str]:
+def decode_access_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload.get("sub")
     except jwt.JWTError:
-        return None
\ No newline at end of file
+        return None
+
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    return payload.get("sub")
\ No newline at end of file
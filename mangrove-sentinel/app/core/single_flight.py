@@ -0,0 +1,84 @@
+"""
+Request coalescing for expensive read-only routes.
+
+    @router.get("/projects")
+    @single_flight
+    def get_projects(db: Session = Depends(get_db)):
+
+While a call is running, identical calls (same route, query and path
+parameters and current user; see `route_keyer`) don't start their own:
+they wait for the running one and return its result, or raise its
+exception. The wrapper is always async, so waiting requests hold no
+threadpool worker; a sync route runs on the threadpool as before.
+Everything happens on the event loop thread, so no locking is needed.
+
+Leader and coalesced request counts per route are exported at /metrics.
+"""
+import asyncio
+import functools
+import inspect
+from typing import Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import registry as metrics_registry
+from app.core.response_cache import route_keyer
+
+_in_flight: Dict[Hashable, asyncio.Future] = {}
+
+# (route, "leader" | "coalesced") -> requests
+requests: Dict[Tuple[str, str], int] = {}
+
+def _count(route: str, role: str):
+    requests[(route, role)] = requests.get((route, role), 0) + 1
+
+def single_flight(endpoint):
+    """Share one in-flight computation between identical concurrent calls of a route"""
+    route = f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__qualname__}"
+    is_async = inspect.iscoroutinefunction(endpoint)
+    route_key = route_keyer(endpoint)
+
+    @functools.wraps(endpoint)
+    async def coalesced(*args, **kwargs):
+        key = route_key(args, kwargs)
+        pending = _in_flight.get(key)
+        if pending is not None:
+            _count(route, "coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leader was cancelled, not us: run the route ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        _in_flight[key] = future
+        _count(route, "leader")
+        try:
+            if is_async:
+                result = await endpoint(*args, **kwargs)
+            else:
+                result = await run_in_threadpool(endpoint, *args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved: don't log it when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if _in_flight.get(key) is future:
+                del _in_flight[key]
+
+    return coalesced
+
+def _render_metrics(lines):
+    lines.append("# HELP single_flight_requests_total Requests to coalescing routes: leaders ran the route, coalesced ones shared a leader's result.")
+    lines.append("# TYPE single_flight_requests_total counter")
+    for (route, role), value in sorted(requests.items()):
+        lines.append(f'single_flight_requests_total{{route="{route}",role="{role}"}} {value}')
+
+metrics_registry.collectors.append(_render_metrics)
@@ -0,0 +1,49 @@
+"""
+Several counters over a table in one pass.
+
+    row = counts(
+        db,
+        tally(
+            Report,
+            validated=count_where(Report.validated == True),
+            pollution=count_where(Report.threat_type == 'pollution'),
+        ),
+        tally(User, volunteers=count_where(User.is_active == True, User.is_sentinel == True)),
+    )
+    row.validated, row.pollution, row.volunteers
+
+Each `tally` is a single scan of its table that evaluates every counter
+(`SUM(CASE WHEN ... THEN 1 ELSE 0 END)`) on each row; `counts` reads any
+number of tallies, one per table, in one statement. A count over a narrow
+slice that an index answers directly (the last year of reports, say) is
+cheaper as its own `count_of(...)` subquery, passed to `counts` by name.
+"""
+from sqlalchemy import and_, case, func, select, true
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+def count_where(*conditions):
+    """Rows matching all of `conditions` (every row if none), as a tally counter"""
+    if not conditions:
+        return func.count()
+    return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+def tally(model, **counters):
+    """One pass over `model` computing the named counters: `count_where(...)` or any other aggregate"""
+    columns = (counter.label(name) for name, counter in counters.items())
+    return select(*columns).select_from(model).subquery(f"{model.__tablename__}_tally")
+
+def count_of(model, *conditions):
+    """COUNT(*) of `model` rows matching `conditions`, as a scalar subquery for `counts`"""
+    return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+def counts(db: Session, *tallies, **columns) -> Row:
+    """Read the tallies, plus any named scalar subqueries, in one SELECT"""
+    query = select(*tallies, *(column.label(name) for name, column in columns.items()))
+    if len(tallies) > 1:
+        # Each tally is a single row: join them side by side
+        joined = tallies[0]
+        for other in tallies[1:]:
+            joined = joined.join(other, true())
+        query = query.select_from(joined)
+    return db.execute(query).one()
@@ -0,0 +1,162 @@
+"""
+Multi-resolution grid of report counts for map clustering.
+
+`report_grid_cells` holds, for every grid level, one row per
+(cell, severity) with the number of reports in the cell and the sums of
+their coordinates (for the cluster centroid). Level L divides the world into
+square cells of 360 / 2**L degrees, so each level is a 2x2 refinement of the
+one before. Triggers keep every level in step with `reports` inside the
+writer's transaction, the same way the monthly rollup is maintained.
+
+A map at zoom z shows 256 * 2**z pixels around the world, so level z + 2 gives
+cells of about CELL_PIXELS on screen and a viewport returns roughly as many
+cells as fit on the screen, however many reports are underneath.
+"""
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import Session
+
+from app.core.geo import BBox
+from app.database.models import Report, ReportGridCell
+
+MIN_LEVEL = 2
+MAX_LEVEL = 16  # ~600 m cells; deeper zooms reuse it
+GRID_LEVELS = range(MIN_LEVEL, MAX_LEVEL + 1)
+CELL_PIXELS = 64
+# Upper bound on cells per response, for oversized viewports
+MAX_CLUSTER_CELLS = 2048
+
+def cell_degrees(level: int) -> float:
+    return 360.0 / 2 ** level
+
+def cell_index(degrees: float, offset: float, level: int) -> int:
+    """Cell number along one axis; `offset` (180 or 90) makes the coordinate non-negative"""
+    return int((degrees + offset) / cell_degrees(level))
+
+def level_for_zoom(zoom: int) -> int:
+    return max(MIN_LEVEL, min(MAX_LEVEL, zoom + 2))
+
+def _cell_sql(row: str, level: int) -> str:
+    size = cell_degrees(level)
+    return (
+        f"CAST(({row}.longitude + 180.0) / {size!r} AS INTEGER), "
+        f"CAST(({row}.latitude + 90.0) / {size!r} AS INTEGER)"
+    )
+
+def _bump(row: str, delta: int) -> str:
+    """Add (or remove) `row` to its cell at every level"""
+    return "".join(f"""
+        INSERT INTO report_grid_cells (level, cell_x, cell_y, severity, report_count, lat_sum, lng_sum)
+        SELECT {level}, {_cell_sql(row, level)}, COALESCE({row}.severity, 'unknown'),
+               {delta}, ({delta}) * {row}.latitude, ({delta}) * {row}.longitude
+        WHERE {row}.latitude IS NOT NULL AND {row}.longitude IS NOT NULL
+        ON CONFLICT (level, cell_x, cell_y, severity) DO UPDATE SET
+            report_count = report_count + excluded.report_count,
+            lat_sum = lat_sum + excluded.lat_sum,
+            lng_sum = lng_sum + excluded.lng_sum;
+    """ for level in GRID_LEVELS)
+
+GRID_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_grid_insert AFTER INSERT ON reports
+    BEGIN {_bump("NEW", 1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_grid_delete AFTER DELETE ON reports
+    BEGIN {_bump("OLD", -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_grid_update
+    AFTER UPDATE OF latitude, longitude, severity ON reports
+    BEGIN {_bump("OLD", -1)} {_bump("NEW", 1)} END
+    """,
+]
+
+# The finest level is counted from `reports`; each coarser level merges
+# pairs of cells from the level below (its cell size doubles, so its cell
+# number is the finer one halved), a pass over cells rather than reports
+BACKFILL_GRID = [
+    f"""
+    INSERT INTO report_grid_cells (level, cell_x, cell_y, severity, report_count, lat_sum, lng_sum)
+    SELECT {MAX_LEVEL}, {_cell_sql("reports", MAX_LEVEL)}, COALESCE(severity, 'unknown'),
+           COUNT(*), SUM(latitude), SUM(longitude)
+    FROM reports
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    GROUP BY 2, 3, 4
+    """,
+    *(f"""
+    INSERT INTO report_grid_cells (level, cell_x, cell_y, severity, report_count, lat_sum, lng_sum)
+    SELECT {level}, cell_x >> 1, cell_y >> 1, severity, SUM(report_count), SUM(lat_sum), SUM(lng_sum)
+    FROM report_grid_cells
+    WHERE level = {level + 1}
+    GROUP BY 2, 3, 4
+    """ for level in reversed(GRID_LEVELS[:-1])),
+]
+
+# Runs once, when the grid table is first created (fresh or existing database)
+ReportGridCell.__table__.add_is_dependent_on(Report.__table__)
+for statement in [*BACKFILL_GRID, *GRID_TRIGGERS]:
+    event.listen(ReportGridCell.__table__, "after_create", DDL(statement))
+
+def _cell_span(bbox: BBox, level: int) -> int:
+    columns = cell_index(bbox.max_lng, 180, level) - cell_index(bbox.min_lng, 180, level) + 1
+    rows = cell_index(bbox.max_lat, 90, level) - cell_index(bbox.min_lat, 90, level) + 1
+    return columns * rows
+
+def report_clusters(db: Session, bbox: BBox, zoom: int) -> Dict:
+    """
+    Clusters for a map viewport in a single query.
+
+    Uses the level matching `zoom`, coarsened until the viewport spans at
+    most MAX_CLUSTER_CELLS cells. Each cluster carries its report count,
+    centroid, cell bounds and a count per severity.
+    """
+    level = level_for_zoom(zoom)
+    while level > MIN_LEVEL and _cell_span(bbox, level) > MAX_CLUSTER_CELLS:
+        level -= 1
+
+    rows = db.query(
+        ReportGridCell.cell_x,
+        ReportGridCell.cell_y,
+        ReportGridCell.severity,
+        ReportGridCell.report_count,
+        ReportGridCell.lat_sum,
+        ReportGridCell.lng_sum
+    ).filter(
+        ReportGridCell.level == level,
+        ReportGridCell.cell_x.between(cell_index(bbox.min_lng, 180, level), cell_index(bbox.max_lng, 180, level)),
+        ReportGridCell.cell_y.between(cell_index(bbox.min_lat, 90, level), cell_index(bbox.max_lat, 90, level)),
+        ReportGridCell.report_count > 0
+    ).all()
+
+    cells = defaultdict(lambda: {"count": 0, "lat_sum": 0.0, "lng_sum": 0.0, "severity": {}})
+    for cell_x, cell_y, severity, report_count, lat_sum, lng_sum in rows:
+        cell = cells[cell_x, cell_y]
+        cell["count"] += report_count
+        cell["lat_sum"] += lat_sum
+        cell["lng_sum"] += lng_sum
+        cell["severity"][severity] = report_count
+
+    size = cell_degrees(level)
+    clusters: List[Dict] = []
+    for (cell_x, cell_y), cell in cells.items():
+        min_lng, min_lat = cell_x * size - 180, cell_y * size - 90
+        clusters.append({
+            "cell": f"{level}/{cell_x}/{cell_y}",
+            "latitude": round(cell["lat_sum"] / cell["count"], 6),
+            "longitude": round(cell["lng_sum"] / cell["count"], 6),
+            "count": cell["count"],
+            "severity": cell["severity"],
+            "bounds": [min_lng, min_lat, min_lng + size, min_lat + size],
+        })
+    clusters.sort(key=lambda cluster: cluster["count"], reverse=True)
+
+    return {
+        "zoom": zoom,
+        "level": level,
+        "cell_degrees": size,
+        "total": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters,
+    }
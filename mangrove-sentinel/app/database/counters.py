@@ -0,0 +1,114 @@
+"""
+Dashboard counter engine.
+
+Each column of the single `dashboard_stats` row counts the rows of a source
+table matching a predicate. SQLite triggers apply +1/-1 deltas inside the
+writing transaction, so counters change atomically with the rows they count
+and the read path never has to write.
+
+Rebuild the counters from the source tables with:
+
+    python -m app.database.counters
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.database.models import Dashboard
+
+# counter column -> (source table, columns that affect it, row predicate)
+COUNTERS = {
+    "active_alerts": ("alerts", ["is_active"], "{row}.is_active = 1"),
+    "validated_reports": ("reports", ["validated"], "{row}.validated = 1"),
+    "community_sentinels": ("users", ["is_active", "is_sentinel"], "{row}.is_active = 1 AND {row}.is_sentinel = 1"),
+    "high_risk_zones": ("zones", ["risk_level"], "{row}.risk_level = 'high'"),
+}
+
+def _matches(predicate: str, row: str) -> str:
+    return f"COALESCE(({predicate.format(row=row)}), 0)"
+
+def _counter_triggers(counter: str, table: str, columns, predicate: str):
+    name = f"trg_{table}_{counter}"
+    new, old = _matches(predicate, "NEW"), _matches(predicate, "OLD")
+    bump = "UPDATE dashboard_stats SET {counter} = {counter} + ({delta}), updated_at = CURRENT_TIMESTAMP;"
+
+    yield f"{name}_insert", f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table}
+    WHEN {new} BEGIN {bump.format(counter=counter, delta=new)} END
+    """
+    yield f"{name}_delete", f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table}
+    WHEN {old} BEGIN {bump.format(counter=counter, delta=f"-{old}")} END
+    """
+    yield f"{name}_update", f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {", ".join(columns)} ON {table}
+    WHEN {new} != {old} BEGIN {bump.format(counter=counter, delta=f"{new} - {old}")} END
+    """
+
+def count_from_source(connection: Connection) -> dict:
+    return {
+        counter: connection.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE {predicate.format(row=table)}")
+        ).scalar()
+        for counter, (table, _, predicate) in COUNTERS.items()
+    }
+
+def reconcile_counters(db: Session) -> Dashboard:
+    """Recompute every counter from its source table and store the result"""
+    counts = count_from_source(db.connection())
+
+    stats = db.query(Dashboard).first()
+    if not stats:
+        stats = Dashboard()
+        db.add(stats)
+
+    for counter, value in counts.items():
+        setattr(stats, counter, value)
+    stats.updated_at = datetime.utcnow()
+    db.flush()
+
+    # Keep exactly one counter row; triggers update every row in the table
+    db.query(Dashboard).filter(Dashboard.id != stats.id).delete(synchronize_session=False)
+    db.commit()
+    return stats
+
+def install_counter_triggers(engine: Engine):
+    """Create any missing counter triggers, rebuilding the counters if so"""
+    with engine.begin() as connection:
+        existing = set(connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        ).scalars())
+
+        triggers = {
+            name: statement
+            for counter, (table, columns, predicate) in COUNTERS.items()
+            for name, statement in _counter_triggers(counter, table, columns, predicate)
+        }
+        has_row = connection.execute(text("SELECT 1 FROM dashboard_stats LIMIT 1")).first() is not None
+
+        if set(triggers) <= existing and has_row:
+            return
+
+        for name, statement in triggers.items():
+            if name not in existing:
+                connection.execute(text(statement))
+
+    # Counters written before the triggers existed cannot be trusted
+    with Session(engine) as db:
+        reconcile_counters(db)
+
+if __name__ == "__main__":
+    from app.database.base import SessionLocal, engine
+    from app.database.migrations import upgrade_schema
+
+    upgrade_schema(engine)
+    db = SessionLocal()
+    try:
+        stats = reconcile_counters(db)
+        print("📊 Dashboard counters rebuilt from source tables:")
+        for counter in COUNTERS:
+            print(f"   {counter}: {getattr(stats, counter)}")
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+"""
+Rank index for the sentinel leaderboard.
+
+`leaderboard_buckets` is a 16-ary tree of counts over point totals, stored
+as rows. Points are shifted by RANK_OFFSET into an unsigned 32-bit key; at
+level L, bucket B counts the active sentinels whose key >> (4 * L) == B.
+Triggers on `users` adjust one bucket per level (LEVELS in all) inside the
+writer's transaction, so ranks are always consistent with `users.points`.
+
+The number of sentinels with fewer points than a key is the sum, at each
+level, of the buckets to the left of the key's own bucket within the same
+parent: at most 15 adjacent rows per level, read by primary-key range. A
+rank therefore costs LEVELS short index ranges however many users there
+are; ties share a rank (1 + the number of sentinels with more points).
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import DDL, and_, event, or_
+from sqlalchemy.orm import Session
+
+from app.database.models import LeaderboardBucket, User
+
+RANK_OFFSET = 2 ** 31
+BRANCHING_BITS = 4
+LEVELS = 8  # 8 * 4 bits covers the 32-bit key
+MAX_KEY = 2 ** (BRANCHING_BITS * LEVELS) - 1
+# Every bucket of the top level: all ranked sentinels
+EVERYONE = (LEVELS - 1, 0, MAX_KEY >> (BRANCHING_BITS * (LEVELS - 1)))
+
+RANKED = "{row}.is_active = 1 AND {row}.is_sentinel = 1"
+
+def _bump(row: str, delta: int) -> str:
+    key = f"MIN(MAX(COALESCE({row}.points, 0) + {RANK_OFFSET}, 0), {MAX_KEY})"
+    return "".join(f"""
+        INSERT INTO leaderboard_buckets (level, bucket, user_count)
+        SELECT {level}, {key} >> {BRANCHING_BITS * level}, {delta}
+        WHERE {RANKED.format(row=row)}
+        ON CONFLICT (level, bucket) DO UPDATE SET user_count = user_count + excluded.user_count;
+    """ for level in range(LEVELS))
+
+LEADERBOARD_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_users_leaderboard_insert AFTER INSERT ON users
+    BEGIN {_bump("NEW", 1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_users_leaderboard_delete AFTER DELETE ON users
+    BEGIN {_bump("OLD", -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_users_leaderboard_update
+    AFTER UPDATE OF points, is_active, is_sentinel ON users
+    BEGIN {_bump("OLD", -1)} {_bump("NEW", 1)} END
+    """,
+]
+
+BACKFILL_LEADERBOARD = [
+    f"""
+    INSERT INTO leaderboard_buckets (level, bucket, user_count)
+    SELECT {level}, MIN(MAX(COALESCE(points, 0) + {RANK_OFFSET}, 0), {MAX_KEY}) >> {BRANCHING_BITS * level}, COUNT(*)
+    FROM users
+    WHERE {RANKED.format(row="users")}
+    GROUP BY 2
+    """
+    for level in range(LEVELS)
+]
+
+# Runs once, when the bucket table is first created (fresh or existing database)
+LeaderboardBucket.__table__.add_is_dependent_on(User.__table__)
+for statement in [*BACKFILL_LEADERBOARD, *LEADERBOARD_TRIGGERS]:
+    event.listen(LeaderboardBucket.__table__, "after_create", DDL(statement))
+
+def rank_key(points: int) -> int:
+    return min(max(points + RANK_OFFSET, 0), MAX_KEY)
+
+def _ranges_below(key: int) -> List[Tuple[int, int, int]]:
+    """(level, first bucket, last bucket) ranges that together count every key below `key`"""
+    if key > MAX_KEY:
+        return [EVERYONE]
+    ranges = []
+    for level in range(LEVELS):
+        bucket = key >> (BRANCHING_BITS * level)
+        first = bucket >> BRANCHING_BITS << BRANCHING_BITS
+        if first < bucket:
+            ranges.append((level, first, bucket - 1))
+    return ranges
+
+def ranks_for(db: Session, points: Iterable[int]) -> Tuple[Dict[int, int], int]:
+    """
+    Competition rank (1 + sentinels with more points) for each point total,
+    and the number of ranked sentinels, in one query.
+    """
+    # Sentinels with more than p points = all of them - those with a key below key(p) + 1
+    wanted = {value: _ranges_below(rank_key(value) + 1) for value in set(points)}
+    ranges = {EVERYONE, *(r for value_ranges in wanted.values() for r in value_ranges)}
+
+    rows = db.query(LeaderboardBucket.level, LeaderboardBucket.bucket, LeaderboardBucket.user_count).filter(or_(*(
+        and_(LeaderboardBucket.level == level, LeaderboardBucket.bucket.between(first, last))
+        for level, first, last in ranges
+    ))).all()
+
+    def total(level_ranges) -> int:
+        return sum(
+            user_count for level, bucket, user_count in rows
+            for r_level, first, last in level_ranges
+            if level == r_level and first <= bucket <= last
+        )
+
+    everyone = total([EVERYONE])
+    return {value: 1 + everyone - total(value_ranges) for value, value_ranges in wanted.items()}, everyone
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+
+from sqlalchemy import DDL, inspect, text
+from sqlalchemy.engine import Engine
+
+from app.database.base import Base
+from app.database import models  # noqa: F401  (registers tables on Base.metadata)
+from app.database import rollups  # noqa: F401  (registers rollup triggers)
+from app.database import clusters  # noqa: F401  (registers map grid triggers)
+from app.database import leaderboard  # noqa: F401  (registers leaderboard rank triggers)
+from app.database.clusters import BACKFILL_GRID, GRID_TRIGGERS
+from app.database.counters import install_counter_triggers
+from app.database.leaderboard import BACKFILL_LEADERBOARD, LEADERBOARD_TRIGGERS
+from app.database.rollups import BACKFILL_ROLLUP, ROLLUP_TRIGGERS
+from app.database.search import install_search_index
+from app.database.spatial import install_spatial_index
+from app.database.sync import install_sync_tracking
+from app.database.versions import install_table_versions
+from app.database.zone_index import install_zone_index
+
+def add_missing_columns(engine: Engine):
+    """ALTER TABLE ... ADD COLUMN for model columns an existing table lacks (nullable, no default)"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+def upgrade_schema(engine: Engine):
+    """
+    Bring an existing database up to the current models.
+
+    `create_all` only creates missing tables, so columns and indexes added to
+    tables that already exist (e.g. the bundled mangrove_sentinel.db) are
+    created here.
+    """
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    install_counter_triggers(engine)
+    install_sync_tracking(engine)
+    install_table_versions(engine)
+    install_spatial_index(engine)
+    install_search_index(engine)
+    install_zone_index(engine)
+
+# Derived tables built by triggers created at table creation: table -> (backfill, triggers)
+AGGREGATE_TABLES = {
+    "report_monthly_rollup": ([BACKFILL_ROLLUP], ROLLUP_TRIGGERS),
+    "report_grid_cells": (BACKFILL_GRID, GRID_TRIGGERS),
+    "leaderboard_buckets": (BACKFILL_LEADERBOARD, LEADERBOARD_TRIGGERS),
+}
+
+def rebuild_derived_data(engine: Engine):
+    """
+    Recompute every trigger-maintained table from the source tables and
+    (re)create any missing triggers. Sync sequence numbers are reassigned,
+    so sync clients have to start over.
+    """
+    with engine.begin() as connection:
+        for table, (backfill, triggers) in AGGREGATE_TABLES.items():
+            connection.execute(text(f"DELETE FROM {table}"))
+            # DDL() for the %-escaped strftime formats, as in the after_create hooks
+            for statement in [*backfill, *triggers]:
+                connection.execute(DDL(statement))
+
+        # Emptying an R*Tree or FTS index row by row is slower than building a
+        # new one: drop them, and install_spatial_index / install_search_index
+        # create and fill new ones
+        connection.execute(text("DROP TABLE IF EXISTS reports_rtree"))
+        connection.execute(text("DROP TABLE IF EXISTS reports_fts"))
+        # An empty sequence makes install_sync_tracking renumber every row
+        connection.execute(text("DELETE FROM change_sequence"))
+        connection.execute(text("UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP"))
+
+    # Each installer recreates what is missing; the counters are reconciled when their triggers were
+    install_counter_triggers(engine)
+    install_sync_tracking(engine)
+    install_table_versions(engine)
+    install_spatial_index(engine)
+    install_search_index(engine)
+
+@contextmanager
+def bulk_load(engine: Engine):
+    """
+    Drop every derived-data trigger and secondary index for the duration of
+    a large load, then build the indexes and derived tables once from the
+    loaded rows. Per-row triggers make about twenty extra writes for every
+    report inserted, and an index sorted once at the end is far cheaper than
+    one updated row by row. Nothing else should write to the database
+    meanwhile, since those writes would only reach the derived tables at the
+    rebuild; open no connection before entering, and hold none open across
+    the exit.
+    """
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes if not index.unique]
+    with engine.begin() as connection:
+        triggers = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars().all()
+        for name in triggers:
+            connection.execute(text(f"DROP TRIGGER {name}"))
+        for index in indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    # Pooled connections opened before a schema change can fail writes to
+    # `reports` with "no such table" (its FTS and R*Tree tables), so start afresh
+    engine.dispose()
+    try:
+        yield
+    finally:
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+        rebuild_derived_data(engine)
+        engine.dispose()
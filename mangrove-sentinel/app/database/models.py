@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import json
+from app.core.geo import polygon_bounds
 from app.database.base import Base
 
 class User(Base):
@@ -20,6 +22,31 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     reports = relationship("Report", back_populates="reporter")
+    
+    __table_args__ = (
+        # Partial indexes: boolean flags are too unselective to lead an index,
+        # so filter on them in the index definition instead
+        Index("ix_users_active_location", "location", sqlite_where=text("is_active = 1")),
+        Index(
+            "ix_users_active_sentinels_points", "points",
+            sqlite_where=text("is_active = 1 AND is_sentinel = 1")
+        ),
+        # Leaderboard order, walked both ways from a user for their neighbours
+        Index(
+            "ix_users_active_sentinels_rank", text("points DESC"), "id",
+            sqlite_where=text("is_active = 1 AND is_sentinel = 1")
+        ),
+    )
+
+class LeaderboardBucket(Base):
+    __tablename__ = "leaderboard_buckets"
+    
+    # Maintained by triggers on `users`, see app/database/leaderboard.py
+    level = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    user_count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {"sqlite_with_rowid": False}
 
 class Sentinel(Base):
     __tablename__ = "sentinels"
@@ -52,6 +79,50 @@ class Report(Base):
     
     reporter_id = Column(Integer, ForeignKey("users.id"))
     reporter = relationship("User", back_populates="reports")
+    
+    # Smallest zone whose polygon contains the point (app/database/zone_index.py)
+    zone_id = Column(Integer, ForeignKey("zones.id"))
+    # Set by triggers on every write, see app/database/sync.py
+    change_seq = Column(Integer)
+    
+    __table_args__ = (
+        # Keyset pagination order for report listings
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        Index("ix_reports_reporter_created_at_id", "reporter_id", "created_at", "id"),
+        # Analytics filters used across ecosystem, conservation, events and community
+        Index("ix_reports_validated_created_at", "validated", "created_at"),
+        Index("ix_reports_threat_type_created_at", "threat_type", "created_at"),
+        Index("ix_reports_location_validated", "location", "validated"),
+        # Covers the SUM(CASE ...) counters of aggregates.tally, so they read the index, not the table
+        Index("ix_reports_threat_type_validated_created_at", "threat_type", "validated", "created_at"),
+        # Per-zone report listings
+        Index("ix_reports_zone_created_at_id", "zone_id", "created_at", "id"),
+        # Delta sync
+        Index("ix_reports_change_seq", "change_seq"),
+    )
+
+class ReportMonthlyRollup(Base):
+    __tablename__ = "report_monthly_rollup"
+    
+    # Maintained by triggers on `reports`, see app/database/rollups.py
+    month = Column(String, primary_key=True)  # "YYYY-MM"
+    threat_type = Column(String, primary_key=True)
+    validated = Column(Boolean, primary_key=True)
+    report_count = Column(Integer, nullable=False, default=0)
+
+class ReportGridCell(Base):
+    __tablename__ = "report_grid_cells"
+    
+    # Maintained by triggers on `reports`, see app/database/clusters.py
+    level = Column(Integer, primary_key=True)  # cells are 360 / 2**level degrees
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    severity = Column(String, primary_key=True)
+    report_count = Column(Integer, nullable=False, default=0)
+    lat_sum = Column(Float, nullable=False, default=0)
+    lng_sum = Column(Float, nullable=False, default=0)
+    
+    __table_args__ = {"sqlite_with_rowid": False}
 
 class Alert(Base):
     __tablename__ = "alerts"
@@ -65,6 +136,12 @@ class Alert(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime)
+    change_seq = Column(Integer)
+    
+    __table_args__ = (
+        Index("ix_alerts_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_alerts_change_seq", "change_seq"),
+    )
 
 class Zone(Base):
     __tablename__ = "zones"
@@ -77,6 +154,67 @@ class Zone(Base):
     area_size = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_patrol = Column(DateTime)
+    
+    # Outer ring as JSON [[lng, lat], ...] and its bounding box
+    boundary = Column(Text)
+    min_lat = Column(Float)
+    max_lat = Column(Float)
+    min_lng = Column(Float)
+    max_lng = Column(Float)
+    change_seq = Column(Integer)
+    
+    __table_args__ = (
+        Index("ix_zones_risk_level", "risk_level"),
+        Index("ix_zones_change_seq", "change_seq"),
+    )
+    
+    @property
+    def polygon(self):
+        return json.loads(self.boundary) if self.boundary else None
+    
+    @polygon.setter
+    def polygon(self, ring):
+        """Store the ring and keep the bounding box in step with it"""
+        for key, value in Zone.boundary_columns(ring).items():
+            setattr(self, key, value)
+    
+    @staticmethod
+    def boundary_columns(ring) -> dict:
+        """Column values for a ring, for bulk inserts that bypass the ORM"""
+        if not ring:
+            return dict(boundary=None, min_lat=None, max_lat=None, min_lng=None, max_lng=None)
+        bbox = polygon_bounds(ring)
+        return dict(
+            boundary=json.dumps(ring),
+            min_lat=bbox.min_lat,
+            max_lat=bbox.max_lat,
+            min_lng=bbox.min_lng,
+            max_lng=bbox.max_lng,
+        )
+
+class ChangeSequence(Base):
+    __tablename__ = "change_sequence"
+    
+    # Single row: the last change_seq handed out across reports, alerts and zones
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    
+    # One row per deleted report, alert or zone, written by triggers
+    change_seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # "report", "alert" or "zone"
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    # Bumped by triggers on every write to the table (app/database/versions.py)
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
 
 class Dashboard(Base):
     __tablename__ = "dashboard_stats"
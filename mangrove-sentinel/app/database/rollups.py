@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import DDL, event, func, select
+from sqlalchemy.orm import Session
+
+from app.database.models import Report, ReportMonthlyRollup
+
+# DDL() applies %-formatting, hence the doubled percent signs
+MONTH = "strftime('%%Y-%%m', COALESCE({row}.created_at, CURRENT_TIMESTAMP))"
+
+def _bump(row: str, delta: int) -> str:
+    return f"""
+        INSERT INTO report_monthly_rollup (month, threat_type, validated, report_count)
+        VALUES ({MONTH.format(row=row)}, {row}.threat_type, COALESCE({row}.validated, 0), {delta})
+        ON CONFLICT (month, threat_type, validated)
+        DO UPDATE SET report_count = report_count + ({delta});
+    """
+
+# Keep the rollup in step with every write to `reports`, whichever code path
+# (ORM, bulk insert, raw SQL) made it, inside the writer's own transaction.
+ROLLUP_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_insert AFTER INSERT ON reports
+    BEGIN {_bump("NEW", 1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_delete AFTER DELETE ON reports
+    BEGIN {_bump("OLD", -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_update
+    AFTER UPDATE OF created_at, threat_type, validated ON reports
+    BEGIN {_bump("OLD", -1)} {_bump("NEW", 1)} END
+    """,
+]
+
+BACKFILL_ROLLUP = f"""
+    INSERT INTO report_monthly_rollup (month, threat_type, validated, report_count)
+    SELECT {MONTH.format(row="reports")}, threat_type, COALESCE(validated, 0), COUNT(*)
+    FROM reports
+    GROUP BY 1, 2, 3
+"""
+
+# Runs once, when the rollup table is first created (fresh or existing database)
+ReportMonthlyRollup.__table__.add_is_dependent_on(Report.__table__)
+for statement in [BACKFILL_ROLLUP, *ROLLUP_TRIGGERS]:
+    event.listen(ReportMonthlyRollup.__table__, "after_create", DDL(statement))
+
+def month_keys(months: int, now: datetime = None) -> List[str]:
+    """Return the last `months` calendar months as "YYYY-MM", oldest first"""
+    now = now or datetime.utcnow()
+    year, month = now.year, now.month
+    keys = []
+    for _ in range(months):
+        keys.append(f"{year:04d}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(keys))
+
+def _group_by_month(keys: List[str], rows) -> Dict[str, List[Tuple[str, bool, int]]]:
+    counts = {key: [] for key in keys}
+    for month, threat_type, validated, report_count in rows:
+        if month in counts and report_count:
+            counts[month].append((threat_type, bool(validated), report_count))
+    return counts
+
+def monthly_report_counts(db: Session, months: int) -> Dict[str, List[Tuple[str, bool, int]]]:
+    """
+    Read the rollup for the last `months` calendar months in a single query.
+
+    Returns {"YYYY-MM": [(threat_type, validated, report_count), ...]} with an
+    entry (possibly empty) for every month in the window.
+    """
+    keys = month_keys(months)
+    rows = db.query(
+        ReportMonthlyRollup.month,
+        ReportMonthlyRollup.threat_type,
+        ReportMonthlyRollup.validated,
+        ReportMonthlyRollup.report_count
+    ).filter(ReportMonthlyRollup.month >= keys[0]).all()
+    return _group_by_month(keys, rows)
+
+def monthly_report_counts_json(keys: List[str]):
+    """
+    The rollup rows from keys[0] on, packed into one JSON array by a scalar
+    subquery, so they can ride along in a larger statement; decode the
+    value with `decode_monthly_report_counts`.
+    """
+    return select(func.json_group_array(func.json_array(
+        ReportMonthlyRollup.month,
+        ReportMonthlyRollup.threat_type,
+        ReportMonthlyRollup.validated,
+        ReportMonthlyRollup.report_count
+    ))).where(ReportMonthlyRollup.month >= keys[0]).scalar_subquery()
+
+def decode_monthly_report_counts(keys: List[str], packed: str) -> Dict[str, List[Tuple[str, bool, int]]]:
+    """Same shape as `monthly_report_counts`"""
+    return _group_by_month(keys, json.loads(packed or "[]"))
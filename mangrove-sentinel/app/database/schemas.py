@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 # User schemas
 class UserBase(BaseModel):
@@ -37,6 +37,19 @@ class User(UserBase):
 class UserProfile(User):
     pass
 
+class LeaderboardEntry(BaseModel):
+    id: int
+    full_name: str
+    points: int
+    rank: int
+
+class LeaderboardPosition(BaseModel):
+    rank: int
+    points: int
+    total: int
+    above: List[LeaderboardEntry]
+    below: List[LeaderboardEntry]
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
@@ -88,6 +101,36 @@ class Report(ReportBase):
     class Config:
         from_attributes = True
 
+class ReportPage(BaseModel):
+    items: List[Report]
+    next_cursor: Optional[str] = None
+
+class UserReportPage(ReportPage):
+    # Every report matching the filters, not just this page
+    total: int
+
+class NearbyReport(Report):
+    distance_km: float
+
+class ReportSearchResult(Report):
+    score: float
+    snippet: str
+
+class ReportCluster(BaseModel):
+    cell: str
+    latitude: float
+    longitude: float
+    count: int
+    severity: Dict[str, int]
+    bounds: List[float]
+
+class ReportClusters(BaseModel):
+    zoom: int
+    level: int
+    cell_degrees: float
+    total: int
+    clusters: List[ReportCluster]
+
 class AlertBase(BaseModel):
     title: str
     message: Optional[str] = None
@@ -107,12 +150,18 @@ class Alert(AlertBase):
     class Config:
         from_attributes = True
 
+class AlertPage(BaseModel):
+    items: List[Alert]
+    next_cursor: Optional[str] = None
+
 class ZoneBase(BaseModel):
     name: str
     description: Optional[str] = None
     risk_level: str = "low"
     coordinates: Optional[str] = None
     area_size: Optional[float] = None
+    # Outer ring of [lng, lat] pairs; defaults to a square of area_size hectares around coordinates
+    polygon: Optional[List[List[float]]] = None
 
 class ZoneCreate(ZoneBase):
     pass
@@ -125,6 +174,22 @@ class Zone(ZoneBase):
     class Config:
         from_attributes = True
 
+class SyncTombstone(BaseModel):
+    entity: str
+    entity_id: int
+    deleted_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class SyncChanges(BaseModel):
+    reports: List[Report]
+    alerts: List[Alert]
+    zones: List[Zone]
+    deleted: List[SyncTombstone]
+    next_token: str
+    has_more: bool
+
 class DashboardStats(BaseModel):
     active_alerts: int
     high_risk_zones: int
@@ -0,0 +1,106 @@
+"""
+Full-text search over reports with SQLite FTS5.
+
+`reports_fts` is an external-content FTS5 table indexing the title,
+description and location of every report; the text itself stays in
+`reports`. Triggers keep the index in step inside the writer's
+transaction, whichever code path wrote the row.
+
+Results are ranked by BM25 with title and location matches weighted above
+the description. Scoring costs a document-size lookup per match, so a common
+word ("mangrove") matching a large part of the table would take hundreds of
+milliseconds to rank in full. Ranking is therefore limited to the newest
+SEARCH_WINDOW matches, which FTS5 finds by walking its index in rowid order.
+"""
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Engine
+
+reports_fts = table("reports_fts", column("rowid"))
+fts_table = literal_column("reports_fts")
+
+# bm25() weights for (title, description, location)
+RANK_WEIGHTS = (10.0, 1.0, 5.0)
+SNIPPET_TOKENS = 16
+SNIPPET_MARKERS = ("**", "**")
+# Only the newest this-many matches are scored
+SEARCH_WINDOW = 5000
+
+INDEXED = "title, description, location"
+
+SEARCH_TRIGGERS = {
+    "trg_reports_fts_insert": f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_fts_insert AFTER INSERT ON reports
+    BEGIN
+        INSERT INTO reports_fts (rowid, {INDEXED}) VALUES (NEW.id, NEW.title, NEW.description, NEW.location);
+    END
+    """,
+    "trg_reports_fts_delete": f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_fts_delete AFTER DELETE ON reports
+    BEGIN
+        INSERT INTO reports_fts (reports_fts, rowid, {INDEXED})
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.location);
+    END
+    """,
+    "trg_reports_fts_update": f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_fts_update AFTER UPDATE OF id, {INDEXED} ON reports
+    BEGIN
+        INSERT INTO reports_fts (reports_fts, rowid, {INDEXED})
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.location);
+        INSERT INTO reports_fts (rowid, {INDEXED}) VALUES (NEW.id, NEW.title, NEW.description, NEW.location);
+    END
+    """,
+}
+
+def install_search_index(engine: Engine):
+    """Create the FTS5 index and its triggers if missing, building a new index from `reports`"""
+    with engine.begin() as connection:
+        existing = set(connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        ).scalars())
+
+        if "reports_fts" not in existing:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE reports_fts USING fts5({INDEXED}, "
+                "content='reports', content_rowid='id', tokenize='porter unicode61')"
+            ))
+            connection.execute(text("INSERT INTO reports_fts (reports_fts) VALUES ('rebuild')"))
+
+        for name, statement in SEARCH_TRIGGERS.items():
+            if name not in existing:
+                connection.execute(text(statement))
+
+_PHRASE = re.compile(r'"([^"]*)"')
+_WORD = re.compile(r"\w+")
+
+def match_expression(q: str) -> str:
+    """
+    Turn user input into an FTS5 query: every word (or "quoted phrase") must
+    appear. FTS5 operators and punctuation in the input are treated as text.
+    """
+    phrases = [" ".join(_WORD.findall(phrase)) for phrase in _PHRASE.findall(q)]
+    words = _WORD.findall(_PHRASE.sub(" ", q))
+    terms = [f'"{term}"' for term in [*phrases, *words] if term]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    return " AND ".join(terms)
+
+def rank():
+    return func.bm25(fts_table, *RANK_WEIGHTS)
+
+def snippet():
+    """The best matching fragment of any indexed column, matches wrapped in SNIPPET_MARKERS"""
+    return func.snippet(fts_table, -1, *SNIPPET_MARKERS, "…", SNIPPET_TOKENS)
+
+def window_floor(query) -> Optional[int]:
+    """
+    Lowest report id among the newest SEARCH_WINDOW matches of `query` (which
+    must join `reports_fts` and carry the MATCH filter), or None when there
+    are fewer matches than that and everything can be ranked.
+    """
+    return query.with_entities(reports_fts.c.rowid) \
+        .order_by(reports_fts.c.rowid.desc()) \
+        .offset(SEARCH_WINDOW - 1).limit(1).scalar()
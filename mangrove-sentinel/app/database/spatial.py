@@ -0,0 +1,130 @@
+"""
+R*Tree spatial index over report coordinates.
+
+`reports_rtree` is an SQLite R*Tree virtual table holding one degenerate box
+(the point) per report that has both latitude and longitude. Triggers keep it
+in step with `reports` inside the writer's transaction, whichever code path
+wrote the row. R*Tree stores 32-bit floats rounded outwards, so it is used to
+find candidates and the exact columns on `reports` decide the match.
+
+A box holding most of the table is better served without the R*Tree:
+walking the newest reports and testing each point fills a page long before
+every candidate has been sorted, so `bbox_is_dense` picks the strategy.
+"""
+import math
+from typing import List, Tuple
+
+from sqlalchemy import and_, column, func, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.geo import BBox, haversine_km, radius_bbox
+from app.database.models import Report
+
+# Beyond this many candidates, scanning by recency beats sorting the candidates
+DENSE_BBOX_CANDIDATES = 5000
+# Nearest-report search starts with this radius and widens it 4x per round
+NEARBY_START_KM = 0.05
+# Rounds needed to reach the largest radius /reports/nearby accepts (500 km)
+NEARBY_MAX_ROUNDS = 8
+
+reports_rtree = table(
+    "reports_rtree",
+    column("id"), column("min_lat"), column("max_lat"), column("min_lng"), column("max_lng"),
+)
+
+HAS_POINT = "NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL"
+INSERT_POINT = "INSERT INTO reports_rtree VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);"
+
+SPATIAL_TRIGGERS = {
+    "trg_reports_rtree_insert": f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_insert AFTER INSERT ON reports
+    WHEN {HAS_POINT} BEGIN {INSERT_POINT} END
+    """,
+    "trg_reports_rtree_update": f"""
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_update AFTER UPDATE OF id, latitude, longitude ON reports
+    BEGIN
+        DELETE FROM reports_rtree WHERE id = OLD.id;
+        INSERT INTO reports_rtree
+        SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude WHERE {HAS_POINT};
+    END
+    """,
+    "trg_reports_rtree_delete": """
+    CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_delete AFTER DELETE ON reports
+    BEGIN DELETE FROM reports_rtree WHERE id = OLD.id; END
+    """,
+}
+
+BACKFILL_RTREE = """
+    INSERT INTO reports_rtree
+    SELECT id, latitude, latitude, longitude, longitude FROM reports
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+def install_spatial_index(engine: Engine):
+    """Create the R*Tree and its triggers if missing, backfilling a new index"""
+    with engine.begin() as connection:
+        existing = set(connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        ).scalars())
+
+        if "reports_rtree" not in existing:
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE reports_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+            ))
+            connection.execute(text(BACKFILL_RTREE))
+
+        for name, statement in SPATIAL_TRIGGERS.items():
+            if name not in existing:
+                connection.execute(text(statement))
+
+def _rtree_candidates(bbox: BBox):
+    return select(reports_rtree.c.id).where(and_(
+        reports_rtree.c.max_lat >= bbox.min_lat,
+        reports_rtree.c.min_lat <= bbox.max_lat,
+        reports_rtree.c.max_lng >= bbox.min_lng,
+        reports_rtree.c.min_lng <= bbox.max_lng,
+    ))
+
+def bbox_is_dense(db: Session, bbox: BBox) -> bool:
+    """True when `bbox` holds at least DENSE_BBOX_CANDIDATES points (counted on the R*Tree alone)"""
+    capped = _rtree_candidates(bbox).limit(DENSE_BBOX_CANDIDATES).subquery()
+    return db.scalar(select(func.count()).select_from(capped)) >= DENSE_BBOX_CANDIDATES
+
+def filter_bbox(query, bbox: BBox, use_rtree: bool = True):
+    """Restrict a Report query to points inside `bbox`"""
+    if use_rtree:
+        query = query.filter(Report.id.in_(_rtree_candidates(bbox)))
+    return query.filter(
+        Report.latitude.between(bbox.min_lat, bbox.max_lat),
+        Report.longitude.between(bbox.min_lng, bbox.max_lng),
+    )
+
+def nearest_reports(query, lat: float, lng: float, radius_km: float, limit: int) -> List[Tuple[int, float]]:
+    """
+    Up to `limit` (report id, distance in km) pairs within `radius_km`, nearest first.
+
+    `query` selects (Report.id, Report.latitude, Report.longitude) with any
+    other filters applied. SQLite keeps the `limit` nearest candidates by
+    equirectangular distance (plain arithmetic, no math functions needed) and
+    the great-circle distance settles the final order and the radius. The
+    search radius grows from NEARBY_START_KM and stops as soon as it holds
+    `limit` matches: nothing outside the circle searched so far can be nearer.
+    """
+    cos_lat = math.cos(math.radians(lat))
+    planar_distance = (Report.latitude - lat) * (Report.latitude - lat) \
+        + (Report.longitude - lng) * (Report.longitude - lng) * (cos_lat * cos_lat)
+
+    radius = min(radius_km, NEARBY_START_KM)
+    while True:
+        candidates = filter_bbox(query, radius_bbox(lat, lng, radius)).order_by(planar_distance).limit(limit)
+        distances = {}
+        for report_id, report_lat, report_lng in candidates:
+            distance = haversine_km(lat, lng, report_lat, report_lng)
+            if distance <= radius:
+                distances[report_id] = distance
+
+        if len(distances) >= limit or radius >= radius_km:
+            nearest = sorted(distances, key=distances.get)
+            return [(report_id, distances[report_id]) for report_id in nearest]
+        radius = min(radius_km, radius * 4)
@@ -0,0 +1,119 @@
+"""
+Change tracking for delta sync.
+
+Every insert or update of a report, alert or zone takes the next value of
+the single-row `change_sequence` counter as its `change_seq`, and every
+delete leaves a row in `sync_tombstones` with its own sequence value. All of
+it happens in triggers, inside the writer's transaction, so the sequence is
+gap-tolerant but strictly increasing in commit order (SQLite has one writer
+at a time). A client that has seen everything up to N asks for rows with
+change_seq > N, which the change_seq indexes answer without touching the
+rest of the table.
+"""
+import base64
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database.models import Alert, Report, SyncTombstone, Zone
+
+# entity name -> (model, table)
+TRACKED = {
+    "report": (Report, "reports"),
+    "alert": (Alert, "alerts"),
+    "zone": (Zone, "zones"),
+}
+
+NEXT_SEQ = "UPDATE change_sequence SET value = value + 1 WHERE id = 1;"
+CURRENT_SEQ = "(SELECT value FROM change_sequence WHERE id = 1)"
+
+def _sync_triggers(entity: str, table: str):
+    stamp = f"UPDATE {table} SET change_seq = {CURRENT_SEQ} WHERE id = NEW.id;"
+    yield f"trg_{table}_sync_insert", f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_insert AFTER INSERT ON {table}
+    BEGIN {NEXT_SEQ} {stamp} END
+    """
+    # Any update except the trigger's own stamping of change_seq
+    yield f"trg_{table}_sync_update", f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_update AFTER UPDATE ON {table}
+    WHEN NEW.change_seq IS OLD.change_seq
+    BEGIN {NEXT_SEQ} {stamp} END
+    """
+    yield f"trg_{table}_sync_delete", f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_delete AFTER DELETE ON {table}
+    BEGIN
+        {NEXT_SEQ}
+        INSERT INTO sync_tombstones (change_seq, entity, entity_id, deleted_at)
+        VALUES ({CURRENT_SEQ}, '{entity}', OLD.id, CURRENT_TIMESTAMP);
+    END
+    """
+
+SYNC_TRIGGERS = {
+    name: statement
+    for entity, (_, table) in TRACKED.items()
+    for name, statement in _sync_triggers(entity, table)
+}
+
+def install_sync_tracking(engine: Engine):
+    """
+    Create the sequence row and triggers if missing. On first install, rows
+    that predate tracking are numbered table by table in id order.
+    """
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT COUNT(*) FROM change_sequence")).scalar() == 0:
+            seq = 0
+            for _, table in TRACKED.values():
+                connection.execute(text(f"UPDATE {table} SET change_seq = id + :offset"), {"offset": seq})
+                seq += connection.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+            connection.execute(text("INSERT INTO change_sequence (id, value) VALUES (1, :seq)"), {"seq": seq})
+
+        existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        for name, statement in SYNC_TRIGGERS.items():
+            if name not in existing:
+                connection.execute(text(statement))
+
+def encode_sync_token(seq: int) -> str:
+    return base64.urlsafe_b64encode(f"seq:{seq}".encode()).decode().rstrip("=")
+
+def decode_sync_token(token: Optional[str]) -> int:
+    if not token:
+        return 0
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        prefix, seq = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        if prefix != "seq":
+            raise ValueError(prefix)
+        return int(seq)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def changes_since(db: Session, since: int, limit: int) -> Tuple[Dict[str, List], List[SyncTombstone], int, bool]:
+    """
+    The first `limit` changes after `since`, in sequence order, across every
+    tracked table and the tombstones: one change_seq range read per table.
+
+    Returns (changed rows by entity, tombstones, last sequence value
+    included, whether more changes remain).
+    """
+    candidates = []
+    truncated = False
+    sources = [(entity, model) for entity, (model, _) in TRACKED.items()] + [("deleted", SyncTombstone)]
+    for entity, model in sources:
+        rows = db.query(model).filter(model.change_seq > since).order_by(model.change_seq).limit(limit).all()
+        candidates.extend((row.change_seq, entity, row) for row in rows)
+        truncated = truncated or len(rows) == limit
+
+    candidates.sort(key=lambda candidate: candidate[0])
+    included = candidates[:limit]
+    has_more = truncated or len(candidates) > limit
+
+    changed = {entity: [] for entity in TRACKED}
+    deleted = []
+    for _, entity, row in included:
+        (deleted if entity == "deleted" else changed[entity]).append(row)
+
+    last_seq = included[-1][0] if included else since
+    return changed, deleted, last_seq, has_more
@@ -0,0 +1,65 @@
+"""
+Per-table change counters for conditional GETs.
+
+Every insert, update or delete on a versioned table bumps its row in
+`table_versions` (version + 1, updated_at = now) from a trigger, inside the
+writer's transaction. A response built from some set of tables is
+unchanged for as long as their versions are, so one primary-key read is
+enough to answer If-None-Match / If-Modified-Since.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.models import TableVersion
+
+VERSIONED_TABLES = ["reports", "alerts", "users", "zones", "dashboard_stats"]
+
+def _version_triggers(table: str):
+    bump = f"""
+        UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE table_name = '{table}';
+    """
+    for operation in ("insert", "update", "delete"):
+        yield f"trg_{table}_version_{operation}", f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{operation} AFTER {operation.upper()} ON {table}
+        BEGIN {bump} END
+        """
+
+VERSION_TRIGGERS = {
+    name: statement
+    for table in VERSIONED_TABLES
+    for name, statement in _version_triggers(table)
+}
+
+def install_table_versions(engine: Engine):
+    """Create the version rows and triggers if missing"""
+    with engine.begin() as connection:
+        for table in VERSIONED_TABLES:
+            connection.execute(text(
+                "INSERT OR IGNORE INTO table_versions (table_name, version, updated_at) "
+                "VALUES (:table, 0, CURRENT_TIMESTAMP)"
+            ), {"table": table})
+
+        existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        for name, statement in VERSION_TRIGGERS.items():
+            if name not in existing:
+                connection.execute(text(statement))
+
+def _versions_query(tables: Iterable[str]):
+    return select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at) \
+        .where(TableVersion.table_name.in_(list(tables)))
+
+def table_versions(db: Session, tables: Iterable[str]) -> Dict[str, Tuple[int, datetime]]:
+    """(version, last write time) of each table, in one query"""
+    rows = db.execute(_versions_query(tables)).all()
+    return {table: (version, updated_at) for table, version, updated_at in rows}
+
+async def async_table_versions(db: AsyncSession, tables: Iterable[str]) -> Dict[str, Tuple[int, datetime]]:
+    """`table_versions` on an AsyncSession"""
+    rows = (await db.execute(_versions_query(tables))).all()
+    return {table: (version, updated_at) for table, version, updated_at in rows}
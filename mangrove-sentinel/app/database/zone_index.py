@@ -0,0 +1,238 @@
+"""
+Zone polygon engine.
+
+ZoneIndex holds every zone polygon in memory. `locate` answers "which zone
+is this point in?" through a uniform grid of GRID_DEGREES cells, each listing
+the zones whose bounding box touches it. `locate_many` does the same for
+NumPy arrays of points in one vectorized pass per zone. Overlapping zones
+resolve to the smallest one.
+
+New and moved reports get `zone_id` from a mapper hook. Bulk loads, zone
+edits and legacy rows are handled by the batch job:
+
+    python -m app.database.zone_index
+"""
+import json
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.geo import BBox, point_in_polygon, polygon_area, square_polygon
+from app.database.models import Report, Zone
+
+GRID_DEGREES = 0.25
+REASSIGN_BATCH_SIZE = 200000
+
+class ZoneIndex:
+    def __init__(self, zones: List[Tuple[int, list]]):
+        """`zones` is [(zone id, ring of [lng, lat]), ...]"""
+        # Smallest first, so the first containing zone is the most specific
+        self.zones = sorted(
+            ((zone_id, [tuple(point) for point in ring]) for zone_id, ring in zones if ring and len(ring) >= 3),
+            key=lambda zone: polygon_area(zone[1]),
+        )
+        self.bounds = {}
+        self.grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+        for position, (zone_id, ring) in enumerate(self.zones):
+            lngs = [lng for lng, _ in ring]
+            lats = [lat for _, lat in ring]
+            bounds = self.bounds[position] = BBox(min(lngs), min(lats), max(lngs), max(lats))
+            for cell_x in range(_cell(bounds.min_lng), _cell(bounds.max_lng) + 1):
+                for cell_y in range(_cell(bounds.min_lat), _cell(bounds.max_lat) + 1):
+                    self.grid[cell_x, cell_y].append(position)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def locate(self, lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+        if lat is None or lng is None:
+            return None
+        for position in self.grid.get((_cell(lng), _cell(lat)), ()):
+            bounds = self.bounds[position]
+            if bounds.min_lng <= lng <= bounds.max_lng and bounds.min_lat <= lat <= bounds.max_lat:
+                zone_id, ring = self.zones[position]
+                if point_in_polygon(lng, lat, ring):
+                    return zone_id
+        return None
+
+    def locate_many(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """
+        Zone id for every point (0 where none contains it).
+
+        Points are sorted by longitude once; each zone then takes its slice
+        with two binary searches and runs even-odd ray casting over just
+        those points, one array operation per polygon edge.
+        """
+        result = np.zeros(len(lats), dtype=np.int64)
+        order = np.argsort(lngs, kind="stable")
+        sorted_lngs = lngs[order]
+
+        # Largest first, so smaller (more specific) zones overwrite
+        for position in reversed(range(len(self.zones))):
+            zone_id, ring = self.zones[position]
+            bounds = self.bounds[position]
+            lo = np.searchsorted(sorted_lngs, bounds.min_lng, side="left")
+            hi = np.searchsorted(sorted_lngs, bounds.max_lng, side="right")
+            if lo == hi:
+                continue
+            candidates = order[lo:hi]
+            candidates = candidates[(lats[candidates] >= bounds.min_lat) & (lats[candidates] <= bounds.max_lat)]
+            if not len(candidates):
+                continue
+
+            x, y = lngs[candidates], lats[candidates]
+            inside = np.zeros(len(candidates), dtype=bool)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                    crosses = (y1 > y) != (y2 > y)
+                    inside ^= crosses & (x < (x2 - x1) * (y - y1) / (y2 - y1) + x1)
+            result[candidates[inside]] = zone_id
+
+        return result
+
+def _cell(degrees: float) -> int:
+    return math.floor(degrees / GRID_DEGREES)
+
+def load_zone_index(connection: Connection) -> ZoneIndex:
+    rows = connection.execute(select(Zone.id, Zone.boundary).where(Zone.boundary.isnot(None)))
+    return ZoneIndex([(zone_id, json.loads(boundary)) for zone_id, boundary in rows])
+
+# One shared index per process, rebuilt after zones change or the TTL lapses
+# (the TTL picks up zone edits made by other processes)
+_index_cache = TTLCache(maxsize=1, ttl=60)
+
+def get_zone_index(connection: Connection) -> ZoneIndex:
+    index = _index_cache.get("zones")
+    if index is None:
+        index = load_zone_index(connection)
+        _index_cache.set("zones", index)
+    return index
+
+def invalidate_zone_index():
+    _index_cache.pop("zones")
+
+# Zone writes are noted at flush and drop the index only once they commit:
+# invalidating at flush would let another request rebuild it from the
+# uncommitted rows (or from the old ones, before the commit lands)
+_ZONES_WRITTEN = "zone_index_zones_written"
+
+@event.listens_for(Session, "after_flush")
+def _record_zone_writes(session, flush_context):
+    if any(isinstance(obj, Zone) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_ZONES_WRITTEN] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_zone_statements(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if getattr(orm_execute_state.statement, "table", None) is Zone.__table__:
+            orm_execute_state.session.info[_ZONES_WRITTEN] = True
+
+@event.listens_for(Session, "after_commit")
+def _zones_committed(session):
+    if session.info.pop(_ZONES_WRITTEN, False):
+        invalidate_zone_index()
+
+@event.listens_for(Session, "after_rollback")
+def _zones_rolled_back(session):
+    session.info.pop(_ZONES_WRITTEN, None)
+
+@event.listens_for(Report, "before_insert")
+def _assign_new_report(mapper, connection, report):
+    if report.zone_id is None:
+        report.zone_id = get_zone_index(connection).locate(report.latitude, report.longitude)
+
+@event.listens_for(Report, "before_update")
+def _reassign_moved_report(mapper, connection, report):
+    state = inspect(report)
+    if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+        report.zone_id = get_zone_index(connection).locate(report.latitude, report.longitude)
+
+def reassign_report_zones(engine: Engine, bbox: Optional[BBox] = None, batch_size: int = REASSIGN_BATCH_SIZE) -> int:
+    """
+    Recompute `zone_id` for every report (or those inside `bbox`) and return
+    how many changed. Reads in id order, batch_size rows per transaction.
+    """
+    with engine.connect() as connection:
+        index = load_zone_index(connection)
+
+    where = "latitude IS NOT NULL AND longitude IS NOT NULL"
+    params = {}
+    if bbox is not None:
+        where += (
+            " AND id IN (SELECT id FROM reports_rtree WHERE max_lat >= :min_lat AND min_lat <= :max_lat"
+            " AND max_lng >= :min_lng AND min_lng <= :max_lng)"
+            " AND latitude BETWEEN :min_lat AND :max_lat AND longitude BETWEEN :min_lng AND :max_lng"
+        )
+        params = bbox._asdict()
+
+    changed = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(text(
+                f"SELECT id, latitude, longitude, COALESCE(zone_id, 0) FROM reports "
+                f"WHERE id > :last_id AND {where} ORDER BY id LIMIT :limit"
+            ), {**params, "last_id": last_id, "limit": batch_size}).all()
+            if not rows:
+                break
+
+            # Plain tuples: NumPy probes Row objects for array interfaces, which is slow
+            data = np.array([tuple(row) for row in rows], dtype=np.float64)
+            ids = data[:, 0].astype(np.int64)
+            current = data[:, 3].astype(np.int64)
+            zones = index.locate_many(data[:, 1], data[:, 2])
+
+            moved = np.nonzero(zones != current)[0]
+            if len(moved):
+                connection.exec_driver_sql(
+                    "UPDATE reports SET zone_id = ? WHERE id = ?",
+                    [(int(zones[i]) or None, int(ids[i])) for i in moved],
+                )
+            changed += len(moved)
+            last_id = int(ids[-1])
+
+    return changed
+
+def zone_geometry_from_centre(coordinates: Optional[str], area_size: Optional[float]):
+    """Square ring for a legacy "lat,lng" zone; `area_size` is in hectares"""
+    try:
+        lat, lng = (float(part) for part in coordinates.split(","))
+    except (AttributeError, ValueError):
+        return None
+    return square_polygon(lat, lng, (area_size or 100.0) / 100)
+
+def backfill_zone_boundaries(engine: Engine) -> int:
+    """Give zones that only have a centre point a square boundary; returns how many"""
+    with Session(engine) as db:
+        zones = db.query(Zone).filter(Zone.boundary.is_(None), Zone.coordinates.isnot(None)).all()
+        filled = 0
+        for zone in zones:
+            ring = zone_geometry_from_centre(zone.coordinates, zone.area_size)
+            if ring:
+                zone.polygon = ring
+                filled += 1
+        db.commit()
+    return filled
+
+def install_zone_index(engine: Engine):
+    """Migrate legacy zones to polygons and assign existing reports if anything changed"""
+    if backfill_zone_boundaries(engine):
+        reassign_report_zones(engine)
+
+if __name__ == "__main__":
+    import time
+
+    from app.database.base import engine
+    from app.database.migrations import upgrade_schema
+
+    upgrade_schema(engine)
+    started = time.perf_counter()
+    changed = reassign_report_zones(engine)
+    print(f"🗺️  Re-assigned {changed} reports to zones in {time.perf_counter() - started:.1f}s")
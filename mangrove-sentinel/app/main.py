@@ -2,19 +2,23 @@ from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.database.base import engine
-from app.database.models import Base, User, Alert, Dashboard, Report
-from app.api.v1 import auth, users, reports, dashboard, alerts, zones, conservation, ecosystem, community, events
+from app.database.base import engine, async_engine
+from app.database.models import User, Alert, Report
+from app.api.v1 import auth, users, reports, dashboard, alerts, zones, conservation, ecosystem, community, events, sync
 from app.database.base import SessionLocal
+from app.database.migrations import upgrade_schema
+from app.core.hashing import password_hasher
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry as metrics_registry
+from app.core import query_budget
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     
     # Initialize sample data
     db = SessionLocal()
@@ -220,19 +224,7 @@ async def lifespan(app: FastAPI):
                 db.add(alert)
             db.commit()
             
-            # Update dashboard stats based on actual data
-            validated_reports_count = db.query(Report).filter(Report.validated == True).count()
-            active_alerts_count = db.query(Alert).filter(Alert.is_active == True).count()
-            community_sentinels_count = db.query(User).filter(User.is_sentinel == True, User.is_active == True).count()
-            
-            dashboard_stats = Dashboard(
-                active_alerts=active_alerts_count,
-                high_risk_zones=7,
-                validated_reports=validated_reports_count,
-                community_sentinels=community_sentinels_count
-            )
-            db.add(dashboard_stats)
-            db.commit()
+            # Dashboard counters are kept in step by triggers (app/database/counters.py)
             
     finally:
         db.close()
@@ -240,7 +232,8 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
-    pass
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -259,6 +252,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+for instrumented in (engine, async_engine.sync_engine):
+    instrument_engine(instrumented)
+
+if settings.QUERY_BUDGET_MODE != "off":
+    app.add_middleware(
+        query_budget.QueryBudgetMiddleware,
+        mode=settings.QUERY_BUDGET_MODE,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+    )
+    for instrumented in (engine, async_engine.sync_engine):
+        query_budget.instrument_engine(instrumented)
 
 # Include API routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
@@ -271,6 +277,7 @@ app.include_router(conservation.router, prefix=f"{settings.API_V1_STR}/conservat
 app.include_router(ecosystem.router, prefix=f"{settings.API_V1_STR}/ecosystem", tags=["ecosystem"]) 
 app.include_router(community.router, prefix=f"{settings.API_V1_STR}/community", tags=["community"])
 app.include_router(events.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
+app.include_router(sync.router, prefix=f"{settings.API_V1_STR}/sync", tags=["sync"])
 
 # Web routes
 @app.get("/", response_class=HTMLResponse)
@@ -319,4 +326,8 @@ async def events_page(request: Request):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": settings.VERSION}
\ No newline at end of file
+    return {"status": "healthy", "version": settings.VERSION}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
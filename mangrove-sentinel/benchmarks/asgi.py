@@ -0,0 +1,117 @@
+"""Minimal in-process ASGI client and load driver shared by the benchmarks"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+async def asgi_request(
+    app,
+    method: str,
+    path: str,
+    query: str = "",
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    raise_exceptions: bool = False
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Send one request straight into an ASGI app and collect the response"""
+    raw_headers = [(b"host", b"bench")]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Only report a disconnect once the response has been sent
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                response_headers[name.decode().lower()] = value.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        if raise_exceptions:
+            raise
+        # Starlette has already sent its 500 response; like a server, record it and carry on
+        status = status or 500
+        response_done.set()
+    return status, response_headers, b"".join(chunks)
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_load(
+    app,
+    method: str,
+    path: str,
+    requests: int,
+    concurrency: int,
+    make_request: Optional[Callable[[int], dict]] = None,
+    **request_kwargs
+) -> dict:
+    """
+    Issue `requests` calls with at most `concurrency` in flight and summarise latency.
+
+    `make_request(i)`, when given, returns the keyword arguments for the i-th
+    call, for routes that need a fresh body each time (e.g. unique emails).
+    """
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for i in remaining:
+            kwargs = make_request(i) if make_request else request_kwargs
+            start = time.perf_counter()
+            status, _, _ = await asgi_request(app, method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "statuses": statuses,
+    }
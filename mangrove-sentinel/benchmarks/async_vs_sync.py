@@ -0,0 +1,76 @@
+"""
+Compare the sync (threadpool) and async (aiosqlite) database paths.
+
+Mounts two routes that run the same dashboard queries, one as a sync `def`
+handler on SessionLocal and one as an `async def` handler on AsyncSession,
+then drives each in-process at the same concurrency and reports requests/sec
+and latency percentiles. Point DATABASE_URL at a seeded database first, e.g.
+
+    DATABASE_URL=sqlite:///./bench.db python seed_data.py
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.async_vs_sync --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.base import async_engine, engine, get_async_db, get_db
+from app.database.models import Dashboard, Report
+from benchmarks.asgi import run_load
+
+def recent_validated():
+    return (
+        select(Report.id, Report.title, Report.created_at)
+        .where(Report.validated == True)
+        .order_by(Report.created_at.desc())
+        .limit(20)
+    )
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(db: Session = Depends(get_db)):
+        stats = db.execute(select(Dashboard).limit(1)).scalars().first()
+        validated = db.scalar(select(func.count()).select_from(Report).where(Report.validated == True))
+        recent = db.execute(recent_validated()).all()
+        return {"active_alerts": stats.active_alerts if stats else 0, "validated": validated, "recent": len(recent)}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        stats = (await db.execute(select(Dashboard).limit(1))).scalars().first()
+        validated = await db.scalar(select(func.count()).select_from(Report).where(Report.validated == True))
+        recent = (await db.execute(recent_validated())).all()
+        return {"active_alerts": stats.active_alerts if stats else 0, "validated": validated, "recent": len(recent)}
+
+    return app
+
+async def main(requests: int, concurrency: int, warmup: int):
+    app = build_app()
+    results = {}
+
+    for path in ("/sync", "/async"):
+        await run_load(app, "GET", path, warmup, concurrency)
+        results[path.strip("/")] = await run_load(app, "GET", path, requests, concurrency)
+
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args.requests, args.concurrency, args.warmup))
+    print(json.dumps(results, indent=2))
+
+    sync, async_ = results["sync"], results["async"]
+    print(f"\nsync : {sync['rps']:>8} req/s  p99 {sync['p99_ms']} ms")
+    print(f"async: {async_['rps']:>8} req/s  p99 {async_['p99_ms']} ms")
@@ -0,0 +1,310 @@
+"""
+End-to-end benchmark of every /api/v1 route.
+
+Seeds a database at the requested scale (once, cached next to the results),
+copies it to a scratch file so every run starts from the same rows, starts
+`app.main:app` with its lifespan in-process and drives each route in turn.
+For every route it records requests/sec, p50/p95/p99 latency, the status
+codes seen and the number of SQL statements executed per request.
+
+    python -m benchmarks.endpoints --scale 100000 --output bench-results.json
+    python -m benchmarks.endpoints --scale 100000 --baseline bench-baseline.json --threshold 0.25
+
+With --baseline the run exits non-zero when any route's p95 latency or
+queries per request grows, or its throughput drops, by more than
+--threshold (a fraction) against the stored results. --update-baseline
+writes the current results to the baseline file instead of comparing.
+
+Every route must have an entry in SCENARIOS; the harness refuses to run
+when a new route has been added without one.
+"""
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "mangrove-bench")
+
+_unique = itertools.count()
+
+def json_body(payload: dict) -> dict:
+    return {"headers": {"content-type": "application/json"}, "body": json.dumps(payload).encode()}
+
+def form_body(payload: dict) -> dict:
+    return {"headers": {"content-type": "application/x-www-form-urlencoded"}, "body": urlencode(payload).encode()}
+
+def new_user(_):
+    n = next(_unique)
+    return json_body({"email": f"bench{n}@example.com", "full_name": f"Bench User {n}", "password": "password123"})
+
+def new_report(_):
+    return json_body({
+        "title": "Benchmark report",
+        "description": "Mangrove cutting observed during benchmark run",
+        "location": "Sundarbans National Park, West Bengal",
+        "latitude": 21.95,
+        "longitude": 88.95,
+        "threat_type": "illegal_cutting",
+        "severity": "high",
+    })
+
+def report_batch(_):
+    """100 reports as a gzip-compressed NDJSON upload"""
+    lines = []
+    for i in range(100):
+        report = json.loads(new_report(None)["body"])
+        report["latitude"] += i * 0.001
+        lines.append(json.dumps(report))
+    return {
+        "headers": {"content-type": "application/x-ndjson", "content-encoding": "gzip"},
+        "body": gzip.compress("\n".join(lines).encode()),
+    }
+
+def new_alert(_):
+    return json_body({
+        "title": "Benchmark alert",
+        "message": "Raised by the benchmark harness",
+        "alert_type": "environmental",
+        "severity": "medium",
+        "location": "Pichavaram Mangroves",
+    })
+
+def new_zone(_):
+    return json_body({"name": f"Benchmark Zone {next(_unique)}", "risk_level": "high", "coordinates": "21.9,88.9", "area_size": 42.0})
+
+# bcrypt-bound routes are capped so the hashing pool is measured, not its 503s
+HASHING = {"max_requests": 50, "max_concurrency": 8}
+
+# "METHOD route path" -> how to call it. Keys: path (concrete URL, defaults to
+# the route path), query, make_request (i -> asgi_request kwargs), auth
+# (send the admin bearer token), max_requests, max_concurrency.
+SCENARIOS = {
+    "POST /api/v1/auth/register": {"make_request": new_user, "auth": False, **HASHING},
+    "POST /api/v1/auth/login": {
+        "make_request": lambda _: json_body({"email": "admin@mangrovesentinel.org", "password": "admin123"}),
+        "auth": False, **HASHING,
+    },
+    "POST /api/v1/auth/token": {
+        "make_request": lambda _: form_body({"username": "admin@mangrovesentinel.org", "password": "admin123"}),
+        "auth": False, **HASHING,
+    },
+    "GET /api/v1/auth/me": {},
+    "GET /api/v1/users/profile": {},
+    "PUT /api/v1/users/profile": {"make_request": lambda _: json_body({"location": "Conservation Center, Mumbai"})},
+    "GET /api/v1/users/leaderboard": {},
+    "GET /api/v1/users/leaderboard/me": {"query": "neighbours=5"},
+    "PUT /api/v1/users/points": {"query": "points=5"},
+    "POST /api/v1/reports/": {"make_request": new_report},
+    "POST /api/v1/reports/bulk": {"make_request": report_batch},
+    "GET /api/v1/reports/": {"query": "limit=50"},
+    "GET /api/v1/reports/bbox": {"query": "bbox=88.9,21.9,89.0,22.0&limit=50", "auth": False},
+    "GET /api/v1/reports/nearby": {"query": "lat=21.95&lng=88.95&radius_km=5&limit=50", "auth": False},
+    "GET /api/v1/reports/search": {"query": "q=oil%20spill&limit=20", "auth": False},
+    "GET /api/v1/reports/clusters": {"query": "bbox=85,20,92,24&zoom=8", "auth": False},
+    "GET /api/v1/reports/export": {"query": "threat_type=pollution&validated=true", "auth": False},
+    "GET /api/v1/reports/{report_id}": {"path": "/api/v1/reports/1"},
+    "PUT /api/v1/reports/{report_id}/validate": {"path": "/api/v1/reports/1/validate"},
+    "GET /api/v1/reports/user/my-reports": {"query": "limit=50"},
+    "GET /api/v1/dashboard/stats": {"auth": False},
+    "GET /api/v1/dashboard/impact": {"auth": False},
+    "GET /api/v1/alerts/": {"query": "limit=50", "auth": False},
+    "GET /api/v1/alerts/export": {"query": "format=ndjson&gzip=true&severity=high", "auth": False},
+    "GET /api/v1/alerts/stream": {"query": "duration=0", "auth": False},
+    "POST /api/v1/alerts/": {"make_request": new_alert},
+    "PUT /api/v1/alerts/{alert_id}/resolve": {"path": "/api/v1/alerts/1/resolve"},
+    "GET /api/v1/sync/": {"query": "limit=500", "auth": False},
+    "GET /api/v1/zones/": {"auth": False},
+    "GET /api/v1/zones/{zone_id}": {"path": "/api/v1/zones/1", "auth": False},
+    "GET /api/v1/zones/{zone_id}/reports": {"path": "/api/v1/zones/1/reports", "query": "limit=50", "auth": False},
+    "POST /api/v1/zones/": {"make_request": new_zone},
+    "GET /api/v1/zones/high-risk/count": {"auth": False},
+    "GET /api/v1/conservation/stats": {"auth": False},
+    "GET /api/v1/conservation/projects": {"auth": False},
+    "GET /api/v1/conservation/updates": {"auth": False},
+    "GET /api/v1/ecosystem/summary": {"auth": False},
+    "GET /api/v1/ecosystem/health-metrics": {"auth": False},
+    "GET /api/v1/ecosystem/environmental-trends": {"auth": False},
+    "GET /api/v1/ecosystem/biodiversity-data": {"auth": False},
+    "GET /api/v1/ecosystem/monitoring-stations": {"auth": False},
+    "GET /api/v1/ecosystem/species-trends": {"auth": False},
+    "GET /api/v1/community/stats": {"auth": False},
+    "GET /api/v1/community/volunteer-opportunities": {"auth": False},
+    "GET /api/v1/community/local-groups": {"auth": False},
+    "GET /api/v1/community/success-stories": {"auth": False},
+    "GET /api/v1/community/volunteer-of-month": {"auth": False},
+    "GET /api/v1/events/stats": {"auth": False},
+    "GET /api/v1/events/upcoming": {"auth": False},
+    "GET /api/v1/events/past-highlights": {"auth": False},
+    "GET /api/v1/events/categories": {"auth": False},
+}
+
+def prepare_database(scale: int, seed: int, data_dir: str, reseed: bool) -> str:
+    """Return the path of a scratch copy of the seeded database for `scale`"""
+    os.makedirs(data_dir, exist_ok=True)
+    seeded = os.path.join(data_dir, f"seed-{scale}-{seed}.db")
+    if reseed or not os.path.exists(seeded):
+        if os.path.exists(seeded):
+            os.remove(seeded)
+        # seed_data reads DATABASE_URL at import time, so seed in a child process
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{seeded}")
+        subprocess.run(
+            [sys.executable, "seed_data.py", "--scale", str(scale), "--seed", str(seed)],
+            env=env, check=True,
+        )
+
+    scratch = os.path.join(data_dir, "run.db")
+    shutil.copyfile(seeded, scratch)
+    return scratch
+
+def v1_routes(app, prefix: str):
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path.startswith(prefix):
+            for method in sorted(route.methods):
+                yield f"{method} {route.path}"
+
+def scenario_request(key: str, token: str):
+    """(method, concrete path, i -> asgi_request kwargs) for the route `key`"""
+    scenario = SCENARIOS[key]
+    method, route_path = key.split(" ", 1)
+    path = scenario.get("path", route_path)
+    auth = {"authorization": f"Bearer {token}"} if scenario.get("auth", True) else {}
+    make = scenario.get("make_request")
+    query = scenario.get("query", "")
+
+    def make_request(i):
+        kwargs = make(i) if make else {}
+        kwargs["headers"] = {**kwargs.get("headers", {}), **auth}
+        kwargs["query"] = query
+        return kwargs
+
+    return method, path, make_request
+
+async def run_suite(requests: int, concurrency: int, warmup: int, only: str = None) -> dict:
+    # Imported here: DATABASE_URL has to be set before app.core.config loads
+    from sqlalchemy import event
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.database.base import async_engine, engine
+    from app.main import app
+    from benchmarks.asgi import run_load
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", count_statement)
+
+    keys = [key for key in v1_routes(app, settings.API_V1_STR) if not only or only in key]
+    missing = [key for key in keys if key not in SCENARIOS]
+    if missing:
+        raise SystemExit("No benchmark scenario for: " + ", ".join(missing))
+
+    token = create_access_token(subject="admin@mangrovesentinel.org")
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        for key in keys:
+            scenario = SCENARIOS[key]
+            method, path, make_request = scenario_request(key, token)
+            n = min(requests, scenario.get("max_requests", requests))
+            c = min(concurrency, scenario.get("max_concurrency", concurrency))
+
+            await run_load(app, method, path, min(warmup, n), c, make_request=make_request)
+            before = statements
+            result = await run_load(app, method, path, n, c, make_request=make_request)
+            result["queries_per_request"] = round((statements - before) / n, 2)
+            results[key] = result
+            print(
+                f"   {key:<48} {result['rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  "
+                f"p95 {result['p95_ms']:>7} ms  p99 {result['p99_ms']:>7} ms  "
+                f"{result['queries_per_request']:>5} q/req  {result['statuses']}"
+            )
+
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Describe every route that regressed by more than `threshold` against `baseline`"""
+    regressions = []
+    for key, base in baseline.get("routes", {}).items():
+        current = results["routes"].get(key)
+        if current is None:
+            continue
+        for metric in ("p95_ms", "queries_per_request"):
+            if base[metric] and current[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{key}: {metric} {base[metric]} -> {current[metric]}")
+        if base["rps"] and current["rps"] < base["rps"] / (1 + threshold):
+            regressions.append(f"{key}: rps {base['rps']} -> {current['rps']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10000, help="reports to seed (see seed_data.py --scale)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the cached seeded database")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", help="only run routes whose 'METHOD path' contains this text")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results to --baseline")
+    args = parser.parse_args()
+
+    print(f"🌱 Preparing database (scale {args.scale}, seed {args.seed})...")
+    database = prepare_database(args.scale, args.seed, args.data_dir, args.reseed)
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+
+    print("🏁 Benchmarking /api/v1 routes...")
+    routes = asyncio.run(run_suite(args.requests, args.concurrency, args.warmup, args.only))
+    results = {
+        "meta": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "routes": routes,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if not args.baseline:
+        return
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"✅ No route regressed beyond {args.threshold:.0%} of {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+SQL query budget check for the v1 API.
+
+Starts the app with QUERY_BUDGET_MODE=raise against a small seeded scratch
+database and calls every /api/v1 route once (using the scenarios from
+benchmarks/endpoints.py), with the auth caches cleared first so budgets
+cover a cold token lookup. Exits non-zero when a route runs more queries
+than its @query_budget allows, repeats a statement shape often enough to
+look like an N+1, or raises.
+
+    python check_query_budgets.py
+"""
+import asyncio
+import os
+import sys
+
+from benchmarks.endpoints import DEFAULT_DATA_DIR, SCENARIOS, prepare_database, scenario_request, v1_routes
+
+SCALE = 2000
+
+async def check() -> list:
+    # Imported here: the settings must see the environment set in main()
+    from app.auth.cache import token_cache, user_cache
+    from app.core.config import settings
+    from app.core.query_budget import QueryBudgetExceeded
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.asgi import asgi_request
+
+    token = create_access_token(subject="admin@mangrovesentinel.org")
+    failures = []
+
+    async with app.router.lifespan_context(app):
+        for key in v1_routes(app, settings.API_V1_STR):
+            if key not in SCENARIOS:
+                failures.append(f"{key}: no scenario in benchmarks/endpoints.py")
+                continue
+            method, path, make_request = scenario_request(key, token)
+            token_cache.clear()
+            user_cache.clear()
+            try:
+                status, _, _ = await asgi_request(app, method, path, raise_exceptions=True, **make_request(0))
+            except QueryBudgetExceeded as e:
+                failures.append(str(e))
+                print(f"❌ {key}")
+            except Exception as e:
+                failures.append(f"{key}: raised {type(e).__name__}: {e}")
+                print(f"❌ {key}")
+            else:
+                print(f"✅ {key} ({status})")
+
+    return failures
+
+def main():
+    database = prepare_database(SCALE, 42, DEFAULT_DATA_DIR, reseed=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["QUERY_BUDGET_MODE"] = "raise"
+
+    failures = asyncio.run(check())
+    if failures:
+        print(f"\n❌ {len(failures)} route(s) over budget or failing:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ Every v1 route is within its query budget")
+
+if __name__ == "__main__":
+    main()
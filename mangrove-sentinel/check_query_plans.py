@@ -0,0 +1,172 @@
+"""
+Query-plan regression check for the v1 API.
+
+Runs every read route against a scratch SQLite database, captures each SQL
+statement it issues and feeds it to EXPLAIN QUERY PLAN. Exits non-zero when a
+statement falls back to a full table scan (a bare `SCAN <table>` step) that
+is not listed in ALLOWED_SCANS, or when a route raises anything but an
+HTTPException.
+
+    python check_query_plans.py
+"""
+import asyncio
+import inspect
+import os
+import re
+import sys
+import tempfile
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.database.migrations import upgrade_schema
+from app.database.models import User
+from app.api.v1 import alerts, community, conservation, dashboard, ecosystem, events, reports, sync, users, zones
+
+# Matches "SCAN reports" but not "SCAN reports USING [COVERING] INDEX ..."
+TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# (route, table) pairs where a scan is bounded or intended
+ALLOWED_SCANS = {
+    ("GET /zones/", "zones"): "unfiltered listing bounded by LIMIT",
+    ("GET /ecosystem/monitoring-stations", "zones"): "first four zones, bounded by LIMIT",
+    ("GET /ecosystem/summary", "zones"): "first four zones, bounded by LIMIT",
+    ("GET /ecosystem/summary", "anon_1"): "the four zones selected above",
+    ("GET /dashboard/stats", "dashboard_stats"): "single-row table",
+    ("GET /reports/bbox", "anon_1"): "counting at most DENSE_BBOX_CANDIDATES R*Tree hits",
+}
+
+# Routes reading their counters through aggregates.tally: one intended pass
+# over each table, then a read of the single-row result
+TALLIES = {
+    "GET /conservation/stats": ["reports", "users"],
+    "GET /community/stats": ["reports", "users"],
+    "GET /ecosystem/summary": ["reports"],
+    "GET /ecosystem/health-metrics": ["reports"],
+}
+for route, tables in TALLIES.items():
+    for table in tables:
+        ALLOWED_SCANS[(route, table)] = "one SUM(CASE ...) pass for every counter"
+        ALLOWED_SCANS[(route, f"{table}_tally")] = "single-row tally"
+
+def run_async(async_engine, handler):
+    """Adapt an `async def` handler to run on its own AsyncSession"""
+    async def run():
+        async with AsyncSession(async_engine) as db:
+            return await handler(db)
+    return lambda db: asyncio.run(run())
+
+def build_routes(user: User, async_engine):
+    return {
+        "GET /reports/": lambda db: reports.get_reports(cursor=None, limit=100, threat_type="pollution", severity=None, status=None, validated=True, db=db),
+        "GET /reports/user/my-reports": lambda db: reports.get_my_reports(cursor=None, limit=100, threat_type=None, severity=None, status=None, validated=None, current_user=user, db=db),
+        "GET /reports/bbox": lambda db: reports.get_reports_in_bbox(bbox="88,21,89.5,22.5", since=None, until=None, threat_type="pollution", severity=None, validated=None, limit=100, db=db),
+        "GET /reports/nearby": lambda db: reports.get_reports_nearby(lat=21.95, lng=88.95, radius_km=5.0, since=None, until=None, threat_type=None, severity=None, validated=None, limit=100, db=db),
+        "GET /reports/search": lambda db: reports.search_reports(q="oil spill", threat_type=None, severity="high", validated=None, since=None, until=None, limit=20, db=db),
+        "GET /reports/clusters": lambda db: reports.get_report_clusters(bbox="85,20,92,24", zoom=8, db=db),
+        "GET /reports/{id}": lambda db: reports.get_report(report_id=user.id, db=db),
+        "GET /alerts/": lambda db: alerts.get_alerts(cursor=None, limit=100, alert_type=None, severity=None, db=db),
+        "GET /users/leaderboard": lambda db: users.get_leaderboard(limit=10, db=db),
+        "GET /users/leaderboard/me": lambda db: users.get_my_leaderboard_position(neighbours=5, current_user=user, db=db),
+        "GET /zones/": lambda db: zones.get_zones(skip=0, limit=100, db=db),
+        "GET /sync/": lambda db: sync.sync_changes(since="c2VxOjEwMA", limit=500, db=db),
+        "GET /zones/{id}/reports": lambda db: zones.get_zone_reports(zone_id=1, cursor=None, limit=100, db=db),
+        "GET /zones/high-risk/count": lambda db: zones.get_high_risk_zones_count(db=db),
+        "GET /dashboard/stats": run_async(async_engine, lambda db: dashboard.get_dashboard_stats(db=db)),
+        "GET /dashboard/impact": run_async(async_engine, lambda db: dashboard.get_impact_data(db=db)),
+        "GET /conservation/stats": lambda db: conservation.get_conservation_stats(db=db),
+        # Coalescing routes are async wrappers around the sync route body; run the body
+        "GET /conservation/projects": lambda db: inspect.unwrap(conservation.get_conservation_projects)(db=db),
+        "GET /conservation/updates": lambda db: conservation.get_recent_updates(db=db),
+        "GET /ecosystem/summary": lambda db: inspect.unwrap(ecosystem.get_ecosystem_summary)(months=7, db=db),
+        "GET /ecosystem/health-metrics": lambda db: ecosystem.get_ecosystem_health_metrics(db=db),
+        "GET /ecosystem/environmental-trends": lambda db: inspect.unwrap(ecosystem.get_environmental_trends)(months=7, db=db),
+        "GET /ecosystem/biodiversity-data": lambda db: ecosystem.get_biodiversity_data(db=db),
+        "GET /ecosystem/monitoring-stations": lambda db: ecosystem.get_monitoring_stations(db=db),
+        "GET /ecosystem/species-trends": lambda db: ecosystem.get_species_trends(db=db),
+        "GET /community/stats": lambda db: community.get_community_stats(db=db),
+        "GET /community/volunteer-opportunities": lambda db: community.get_volunteer_opportunities(db=db),
+        "GET /community/local-groups": lambda db: community.get_local_groups(db=db),
+        "GET /community/success-stories": lambda db: community.get_success_stories(db=db),
+        "GET /community/volunteer-of-month": lambda db: community.get_volunteer_of_month(db=db),
+        "GET /events/stats": lambda db: events.get_events_stats(db=db),
+        "GET /events/upcoming": lambda db: events.get_upcoming_events(db=db),
+        "GET /events/past-highlights": lambda db: events.get_past_event_highlights(db=db),
+        "GET /events/categories": lambda db: events.get_event_categories(db=db),
+    }
+
+def capture_statements(engines, db, handler):
+    """(SELECT statements the handler ran, the exception it raised or None)"""
+    statements = []
+    error = None
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        handler(db)
+    except HTTPException:
+        # A 404 on the empty scratch database still ran the lookup
+        pass
+    except Exception as e:
+        # Still check the statements issued before the handler failed
+        error = e
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements, error
+
+def explain(engine, statement, parameters):
+    raw = engine.raw_connection()
+    try:
+        rows = raw.cursor().execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        raw.close()
+    return [row[-1] for row in rows]
+
+def check_query_plans() -> list:
+    failures = []
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "plans.db")
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        upgrade_schema(engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+        try:
+            user = User(email="plan@check.local", hashed_password="x", full_name="Plan Check", is_sentinel=True)
+            db.add(user)
+            db.commit()
+
+            engines = [engine, async_engine.sync_engine]
+            for route, handler in build_routes(user, async_engine).items():
+                statements, error = capture_statements(engines, db, handler)
+                if error is not None:
+                    failures.append((route, f"raised {type(error).__name__}: {error}", ""))
+                for statement, parameters in statements:
+                    for step in explain(engine, statement, parameters):
+                        match = TABLE_SCAN.match(step)
+                        if match and (route, match.group(1)) not in ALLOWED_SCANS:
+                            failures.append((route, step, " ".join(statement.split())))
+        finally:
+            db.close()
+            engine.dispose()
+
+    return failures
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    for route, step, statement in failures:
+        print(f"❌ {route}: {step}" + (f"\n   {statement}" if statement else ""))
+
+    if failures:
+        print(f"\n{len(failures)} problem(s) found: full table scans or routes that raised")
+        sys.exit(1)
+    print("✅ No full table scans in v1 read routes")
@@ -1,8 +1,13 @@
+import argparse
 import random
 import string
 from datetime import datetime, timedelta
+from sqlalchemy import text
 from app.database.base import SessionLocal, engine
-from app.database.models import Base, User, Report, Alert, Zone, Dashboard
+from app.database.models import Base, User, Report, Alert, Zone, Dashboard, SyncTombstone
+from app.database.migrations import bulk_load, upgrade_schema
+from app.database.counters import reconcile_counters
+from app.database.zone_index import reassign_report_zones, zone_geometry_from_centre
 from app.core.security import get_password_hash
 
 # Lists for generating realistic data
@@ -71,11 +76,12 @@ ALERT_TYPES = ["illegal_activity", "environmental", "pollution", "construction",
 def generate_email(first_name, last_name, index):
     """Generate realistic email addresses"""
     domains = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "email.com", "proton.me"]
+    # The index keeps addresses unique however many users are generated
     email_formats = [
-        f"{first_name.lower()}.{last_name.lower()}{random.randint(1, 999)}@{random.choice(domains)}",
-        f"{first_name.lower()}{last_name.lower()}{random.randint(10, 99)}@{random.choice(domains)}",
-        f"{first_name.lower()}{random.randint(100, 999)}@{random.choice(domains)}",
-        f"{last_name.lower()}.{first_name.lower()}@{random.choice(domains)}"
+        f"{first_name.lower()}.{last_name.lower()}{index}@{random.choice(domains)}",
+        f"{first_name.lower()}_{last_name.lower()}{index}@{random.choice(domains)}",
+        f"{first_name.lower()}{index}@{random.choice(domains)}",
+        f"{last_name.lower()}.{first_name.lower()}{index}@{random.choice(domains)}"
     ]
     return random.choice(email_formats)
 
@@ -113,201 +119,232 @@ def generate_threat_reports():
     
     return report_templates, details
 
-def seed_database():
+ALERT_TEMPLATES = [
+    "Critical alert: {activity} detected in {location}",
+    "Environmental warning: {activity} reported at {location}",
+    "Urgent response needed: {activity} in {location}",
+    "Monitoring alert: {activity} observed near {location}",
+    "Community report: {activity} affecting {location}",
+    "Satellite detection: {activity} identified at {location}",
+    "Patrol report: {activity} confirmed in {location}",
+    "Emergency alert: {activity} threatening {location}",
+    "Compliance violation: {activity} at {location}",
+    "Conservation alert: {activity} impacting {location}"
+]
+
+ALERT_ACTIVITIES = [
+    "illegal mangrove cutting", "industrial pollution", "unauthorized construction",
+    "overfishing activities", "waste dumping", "sand mining", "chemical discharge",
+    "oil spill contamination", "habitat destruction", "wildlife disturbance"
+]
+
+# Rows per INSERT ... executemany; each table is loaded in a single transaction
+BATCH_SIZE = 10000
+
+def generate_users(count, now):
+    """Yield user rows with explicit ids 1..count+1, the admin first"""
+    # bcrypt is far too slow to run per row, so every seeded user shares one hash
+    password_hash = get_password_hash("password123")
+
+    yield dict(
+        id=1,
+        email="admin@mangrovesentinel.org",
+        hashed_password=get_password_hash("admin123"),
+        full_name="Admin User",
+        phone=generate_phone(),
+        location="Conservation Center, Mumbai",
+        is_active=True,
+        is_sentinel=True,
+        points=1000,
+        created_at=now,
+        updated_at=now
+    )
+
+    for i in range(count):
+        first_name = random.choice(FIRST_NAMES)
+        last_name = random.choice(LAST_NAMES)
+        created_at = now - timedelta(days=random.randint(1, 365))
+        yield dict(
+            id=i + 2,
+            email=generate_email(first_name, last_name, i),
+            hashed_password=password_hash,
+            full_name=f"{first_name} {last_name}",
+            phone=generate_phone(),
+            location=random.choice(INDIAN_LOCATIONS),
+            is_active=True,
+            is_sentinel=random.choice([True, True, True, False]),  # 75% sentinels
+            points=random.randint(0, 500),
+            created_at=created_at,
+            updated_at=created_at
+        )
+
+def generate_reports(count, user_count, now):
+    report_templates, details = generate_threat_reports()
+
+    for i in range(count):
+        location_name, lat, lng = random.choice(MANGROVE_LOCATIONS)
+        template = random.choice(report_templates)
+        detail = random.choice(details)
+
+        yield dict(
+            id=i + 1,
+            title=template.split('.')[0].format(location=location_name.split(',')[0]),
+            description=template.format(location=location_name, details=detail),
+            location=location_name,
+            # Add some location variation
+            latitude=lat + random.uniform(-0.01, 0.01),
+            longitude=lng + random.uniform(-0.01, 0.01),
+            threat_type=random.choice(THREAT_TYPES),
+            severity=random.choice(SEVERITIES),
+            status=random.choice(STATUSES),
+            validated=random.choice([True, False, False]),  # 33% validated
+            reporter_id=random.randint(1, user_count),
+            created_at=now - timedelta(days=random.randint(1, 180)),
+            updated_at=now - timedelta(days=random.randint(0, 30))
+        )
+
+def generate_alerts(count, now):
+    for i in range(count):
+        location_name, _, _ = random.choice(MANGROVE_LOCATIONS)
+        activity = random.choice(ALERT_ACTIVITIES)
+        template = random.choice(ALERT_TEMPLATES)
+
+        yield dict(
+            id=i + 1,
+            title=template.format(activity=activity, location=location_name.split(',')[0]),
+            message=f"Immediate attention required. {activity.capitalize()} has been reported and requires response team deployment.",
+            alert_type=random.choice(ALERT_TYPES),
+            severity=random.choice(SEVERITIES),
+            location=location_name,
+            is_active=random.choice([True, True, False]),  # 66% active
+            created_at=now - timedelta(days=random.randint(1, 90)),
+            resolved_at=None if random.choice([True, False]) else now - timedelta(days=random.randint(1, 30))
+        )
+
+def generate_zones(now):
+    for i, (location_name, lat, lng) in enumerate(MANGROVE_LOCATIONS):
+        zone_name = location_name.split(',')[0]
+        coordinates = f"{lat},{lng}"
+        area_size = random.uniform(50.0, 500.0)
+        yield dict(
+            name=f"Zone {i+1:02d} - {zone_name}",
+            description=f"Protected mangrove monitoring area covering {zone_name} and surrounding ecosystem.",
+            risk_level=random.choice(["low", "medium", "high"]),
+            coordinates=coordinates,
+            area_size=area_size,
+            created_at=now - timedelta(days=random.randint(30, 365)),
+            last_patrol=now - timedelta(days=random.randint(1, 30)),
+            **Zone.boundary_columns(zone_geometry_from_centre(coordinates, area_size))
+        )
+
+    # Add additional zones for variety
+    for i in range(15):
+        coordinates = f"{random.uniform(8.0, 24.0)},{random.uniform(68.0, 97.0)}"
+        area_size = random.uniform(25.0, 300.0)
+        yield dict(
+            name=f"Monitoring Zone {i+21:02d}",
+            description=f"Extended monitoring area covering coastal mangrove systems.",
+            risk_level=random.choice(["low", "medium", "high"]),
+            coordinates=coordinates,
+            area_size=area_size,
+            created_at=now - timedelta(days=random.randint(60, 400)),
+            last_patrol=now - timedelta(days=random.randint(1, 45)),
+            **Zone.boundary_columns(zone_geometry_from_centre(coordinates, area_size))
+        )
+
+def bulk_insert(db, model, rows, label):
+    """
+    Insert `rows` in BATCH_SIZE executemany batches and commit once at the end.
+    Core inserts: the ORM bulk path splits a batch wherever the set of None
+    columns changes (e.g. alerts' resolved_at), into thousands of statements.
+    """
+    created = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.execute(model.__table__.insert(), batch)
+            created += len(batch)
+            batch = []
+            print(f"   ✓ Created {created} {label}...")
+    if batch:
+        db.execute(model.__table__.insert(), batch)
+        created += len(batch)
+    db.commit()
+    print(f"   ✅ Created {created} {label}")
+    return created
+
+def load_sample_data(db, users, reports, alerts, now):
+    """Replace the sample tables' rows with freshly generated ones"""
+    if engine.dialect.name == "sqlite":
+        # Throwaway data: skip the fsync after every commit
+        db.execute(text("PRAGMA synchronous = OFF"))
+
+    # Clear existing data
+    print("🧹 Clearing existing data...")
+    try:
+        db.query(Report).delete()
+        db.query(Alert).delete()
+        db.query(Zone).delete()
+        db.query(User).delete()
+        # A fresh seed starts sync history over
+        db.query(SyncTombstone).delete()
+        db.commit()
+    except:
+        # Tables might not exist yet, that's ok
+        db.rollback()
+
+    # 1. Users (the admin plus `users` regular accounts)
+    print(f"👥 Creating {users + 1} sample users...")
+    user_count = bulk_insert(db, User, generate_users(users, now), "users")
+
+    # 2. Reports
+    print(f"📋 Creating {reports} sample reports...")
+    bulk_insert(db, Report, generate_reports(reports, user_count, now), "reports")
+
+    # 3. Alerts
+    print(f"🚨 Creating {alerts} sample alerts...")
+    bulk_insert(db, Alert, generate_alerts(alerts, now), "alerts")
+
+    # 4. Create Monitoring Zones
+    print("🗺️  Creating monitoring zones...")
+    bulk_insert(db, Zone, generate_zones(now), "monitoring zones")
+
+    # Bulk inserts bypass the per-report zone hook, so assign in one batch
+    print("🧭 Assigning reports to zones...")
+    print(f"   ✅ Assigned {reassign_report_zones(engine)} reports")
+
+def seed_database(users=220, reports=205, alerts=215, seed=42):
     """Seed the database with comprehensive test data"""
+    # A fixed seed makes every run (and every benchmark database) identical
+    random.seed(seed)
+    now = datetime.utcnow()
+
     # Create all tables first
     print("🏗️  Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     
     db = SessionLocal()
     
     try:
         print("🌱 Starting database seeding...")
-        
-        # Clear existing data
-        print("🧹 Clearing existing data...")
-        try:
-            db.query(Report).delete()
-            db.query(Alert).delete()
-            db.query(Zone).delete()
-            db.query(User).delete()
-            db.query(Dashboard).delete()
-            db.commit()
-        except:
-            # Tables might not exist yet, that's ok
-            db.rollback()
-        
-        # 1. Create 200+ Users
-        print("👥 Creating 200+ sample users...")
-        users = []
-        
-        # Add admin user
-        admin_user = User(
-            email="admin@mangrovesentinel.org",
-            hashed_password=get_password_hash("admin123"),
-            full_name="Admin User",
-            phone=generate_phone(),
-            location="Conservation Center, Mumbai",
-            is_sentinel=True,
-            points=1000
-        )
-        users.append(admin_user)
-        db.add(admin_user)
-        
-        # Generate 220 regular users
-        for i in range(220):
-            first_name = random.choice(FIRST_NAMES)
-            last_name = random.choice(LAST_NAMES)
-            email = generate_email(first_name, last_name, i)
-            
-            user = User(
-                email=email,
-                hashed_password=get_password_hash("password123"),
-                full_name=f"{first_name} {last_name}",
-                phone=generate_phone(),
-                location=random.choice(INDIAN_LOCATIONS),
-                is_sentinel=random.choice([True, True, True, False]),  # 75% sentinels
-                points=random.randint(0, 500),
-                created_at=datetime.utcnow() - timedelta(days=random.randint(1, 365))
-            )
-            users.append(user)
-            db.add(user)
-            
-            if i % 50 == 0:
-                print(f"   ✓ Created {i+1} users...")
-                db.commit()
-        
-        db.commit()
-        print(f"   ✅ Created {len(users)} total users")
-        
-        # 2. Create 200+ Reports
-        print("📋 Creating 200+ sample reports...")
-        report_templates, details = generate_threat_reports()
-        
-        for i in range(205):
-            location_name, lat, lng = random.choice(MANGROVE_LOCATIONS)
-            template = random.choice(report_templates)
-            detail = random.choice(details)
-            
-            # Add some location variation
-            lat_offset = random.uniform(-0.01, 0.01)
-            lng_offset = random.uniform(-0.01, 0.01)
-            
-            report = Report(
-                title=template.split('.')[0].format(location=location_name.split(',')[0]),
-                description=template.format(location=location_name, details=detail),
-                location=location_name,
-                latitude=lat + lat_offset,
-                longitude=lng + lng_offset,
-                threat_type=random.choice(THREAT_TYPES),
-                severity=random.choice(SEVERITIES),
-                status=random.choice(STATUSES),
-                validated=random.choice([True, False, False]),  # 33% validated
-                reporter_id=random.choice(users).id,
-                created_at=datetime.utcnow() - timedelta(days=random.randint(1, 180)),
-                updated_at=datetime.utcnow() - timedelta(days=random.randint(0, 30))
-            )
-            db.add(report)
-            
-            if i % 50 == 0:
-                print(f"   ✓ Created {i+1} reports...")
-                db.commit()
-        
-        db.commit()
-        print("   ✅ Created 205+ reports")
-        
-        # 3. Create 200+ Alerts
-        print("🚨 Creating 200+ sample alerts...")
-        alert_templates = [
-            "Critical alert: {activity} detected in {location}",
-            "Environmental warning: {activity} reported at {location}",
-            "Urgent response needed: {activity} in {location}",
-            "Monitoring alert: {activity} observed near {location}",
-            "Community report: {activity} affecting {location}",
-            "Satellite detection: {activity} identified at {location}",
-            "Patrol report: {activity} confirmed in {location}",
-            "Emergency alert: {activity} threatening {location}",
-            "Compliance violation: {activity} at {location}",
-            "Conservation alert: {activity} impacting {location}"
-        ]
-        
-        activities = [
-            "illegal mangrove cutting", "industrial pollution", "unauthorized construction",
-            "overfishing activities", "waste dumping", "sand mining", "chemical discharge",
-            "oil spill contamination", "habitat destruction", "wildlife disturbance"
-        ]
-        
-        for i in range(215):
-            location_name, _, _ = random.choice(MANGROVE_LOCATIONS)
-            activity = random.choice(activities)
-            template = random.choice(alert_templates)
-            
-            alert = Alert(
-                title=template.format(activity=activity, location=location_name.split(',')[0]),
-                message=f"Immediate attention required. {activity.capitalize()} has been reported and requires response team deployment.",
-                alert_type=random.choice(ALERT_TYPES),
-                severity=random.choice(SEVERITIES),
-                location=location_name,
-                is_active=random.choice([True, True, False]),  # 66% active
-                created_at=datetime.utcnow() - timedelta(days=random.randint(1, 90)),
-                resolved_at=None if random.choice([True, False]) else datetime.utcnow() - timedelta(days=random.randint(1, 30))
-            )
-            db.add(alert)
-            
-            if i % 50 == 0:
-                print(f"   ✓ Created {i+1} alerts...")
-                db.commit()
-        
-        db.commit()
-        print("   ✅ Created 215+ alerts")
-        
-        # 4. Create Monitoring Zones
-        print("🗺️  Creating monitoring zones...")
-        for i, (location_name, lat, lng) in enumerate(MANGROVE_LOCATIONS):
-            zone_name = location_name.split(',')[0]
-            
-            zone = Zone(
-                name=f"Zone {i+1:02d} - {zone_name}",
-                description=f"Protected mangrove monitoring area covering {zone_name} and surrounding ecosystem.",
-                risk_level=random.choice(["low", "medium", "high"]),
-                coordinates=f"{lat},{lng}",
-                area_size=random.uniform(50.0, 500.0),
-                created_at=datetime.utcnow() - timedelta(days=random.randint(30, 365)),
-                last_patrol=datetime.utcnow() - timedelta(days=random.randint(1, 30))
-            )
-            db.add(zone)
-        
-        # Add additional zones for variety
-        for i in range(15):
-            zone = Zone(
-                name=f"Monitoring Zone {i+21:02d}",
-                description=f"Extended monitoring area covering coastal mangrove systems.",
-                risk_level=random.choice(["low", "medium", "high"]),
-                coordinates=f"{random.uniform(8.0, 24.0)},{random.uniform(68.0, 97.0)}",
-                area_size=random.uniform(25.0, 300.0),
-                created_at=datetime.utcnow() - timedelta(days=random.randint(60, 400)),
-                last_patrol=datetime.utcnow() - timedelta(days=random.randint(1, 45))
-            )
-            db.add(zone)
-        
-        db.commit()
-        print("   ✅ Created 35+ monitoring zones")
+        # Derived tables (rollups, counters, spatial and search indexes, ...) are
+        # rebuilt once when the block exits instead of by per-row triggers
+        with bulk_load(engine):
+            try:
+                load_sample_data(db, users, reports, alerts, now)
+            except Exception:
+                # Release the write lock before the rebuild
+                db.rollback()
+                raise
+            print("🔁 Rebuilding derived tables...")
         
         # 5. Update Dashboard Statistics
         print("📊 Updating dashboard statistics...")
-        validated_reports_count = db.query(Report).filter(Report.validated == True).count()
-        active_alerts_count = db.query(Alert).filter(Alert.is_active == True).count()
-        community_sentinels_count = db.query(User).filter(User.is_sentinel == True, User.is_active == True).count()
-        high_risk_zones_count = db.query(Zone).filter(Zone.risk_level == "high").count()
-        
-        dashboard_stats = Dashboard(
-            active_alerts=active_alerts_count,
-            high_risk_zones=high_risk_zones_count,
-            validated_reports=validated_reports_count,
-            community_sentinels=community_sentinels_count
-        )
-        db.add(dashboard_stats)
-        db.commit()
+        stats = reconcile_counters(db)
+        validated_reports_count = stats.validated_reports
+        active_alerts_count = stats.active_alerts
+        community_sentinels_count = stats.community_sentinels
         
         print("\n🎉 Database seeding completed successfully!")
         print(f"📈 Final Statistics:")
@@ -327,4 +364,20 @@ def seed_database():
         db.close()
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the Mangrove Sentinel database with sample data")
+    parser.add_argument("--scale", type=int, help="number of reports to generate; users and alerts scale with it (N/10 and N/2)")
+    parser.add_argument("--users", type=int, help="number of regular users (overrides --scale)")
+    parser.add_argument("--alerts", type=int, help="number of alerts (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    args = parser.parse_args()
+
+    if args.scale:
+        counts = dict(users=max(1, args.scale // 10), reports=args.scale, alerts=args.scale // 2)
+    else:
+        counts = dict(users=220, reports=205, alerts=215)
+    if args.users is not None:
+        counts["users"] = args.users
+    if args.alerts is not None:
+        counts["alerts"] = args.alerts
+
+    seed_database(seed=args.seed, **counts)
@@ -177,9 +177,11 @@ async function loadUserReports() {
         });
 
         if (response.ok) {
-            const reports = await response.json();
+            // The list shows the most recent page; the counter is the API's total
+            const page = await response.json();
+            const reports = page.items;
             const container = document.getElementById('user-reports-list');
-            document.getElementById('user-reports').textContent = reports.length;
+            document.getElementById('user-reports').textContent = page.total;
             
             if (reports.length === 0) {
                 container.innerHTML = '<p class="muted">No reports submitted yet.</p>';
@@ -12,9 +12,34 @@ document.addEventListener('DOMContentLoaded', async function() {
   // Only run on dashboard page
   if (window.location.pathname === '/dashboard') {
     await loadDashboardData();
+    subscribeToLiveUpdates();
   }
 });
 
+// Alerts currently shown on the dashboard, newest first
+let dashboardAlerts = [];
+
+// Live counters and alerts pushed by the server instead of polling
+function subscribeToLiveUpdates() {
+  if (!window.EventSource) return;
+  const stream = new EventSource('/api/v1/alerts/stream');
+
+  stream.addEventListener('stats', event => {
+    updateDashboardStats(JSON.parse(event.data));
+  });
+  stream.addEventListener('alert.created', event => {
+    dashboardAlerts.unshift(JSON.parse(event.data));
+    updateAlertsList(dashboardAlerts);
+  });
+  stream.addEventListener('alert.resolved', event => {
+    const { id } = JSON.parse(event.data);
+    dashboardAlerts = dashboardAlerts.filter(alert => alert.id !== id);
+    updateAlertsList(dashboardAlerts);
+  });
+  // Too many updates were missed while disconnected: start over
+  stream.addEventListener('reset', () => loadDashboardData());
+}
+
 async function loadDashboardData() {
   try {
     // Load dashboard stats
@@ -27,8 +52,9 @@ async function loadDashboardData() {
     // Load alerts
     const alertsResponse = await fetch('/api/v1/alerts');
     if (alertsResponse.ok) {
-      const alerts = await alertsResponse.json();
-      updateAlertsList(alerts);
+      const alertsPage = await alertsResponse.json();
+      dashboardAlerts = alertsPage.items;
+      updateAlertsList(dashboardAlerts);
     }
 
     // Load impact data and update chart